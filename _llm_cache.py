@@ -0,0 +1,66 @@
+# _llm_cache.py
+"""
+Exakter Antwort-Cache für Chat-Completions (In-Memory, LRU + TTL).
+
+Schlüssel = blake2b über Request-Parameter (Modell, Temperatur, max_tokens, …)
+und die kompletten Messages. Gespeichert wird nur bereits nachbearbeiteter,
+brauchbarer Text – Fehler/Fallbacks landen nie im Cache.
+Kreative Calls (temperature > 0.7) werden nicht gecacht.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Mapping, Optional
+
+_TTL = float(os.getenv("UNDO_LLM_CACHE_TTL", str(24 * 3600)))
+_MAX = 4096
+_MAX_TEMPERATURE = 0.7
+
+_ENTRIES: "OrderedDict[str, tuple[float, str]]" = OrderedDict()  # key -> (ablauf_monotonic, text)
+_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0}
+
+
+def key_for(params: Mapping, messages: list) -> Optional[str]:
+    """Cache-Schlüssel oder None, wenn der Request nicht gecacht werden soll."""
+    if float(params.get("temperature", 1.0)) > _MAX_TEMPERATURE:
+        return None
+    raw = json.dumps([dict(params), messages], sort_keys=True, ensure_ascii=False, default=dict)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get(key: Optional[str]) -> Optional[str]:
+    if key is None:
+        return None
+    now = time.monotonic()
+    with _LOCK:
+        entry = _ENTRIES.get(key)
+        if entry is None or entry[0] < now:
+            if entry is not None:
+                del _ENTRIES[key]
+            _STATS["misses"] += 1
+            return None
+        _ENTRIES.move_to_end(key)
+        _STATS["hits"] += 1
+        return entry[1]
+
+
+def put(key: Optional[str], text: str) -> None:
+    if key is None:
+        return
+    with _LOCK:
+        _ENTRIES[key] = (time.monotonic() + _TTL, text)
+        _ENTRIES.move_to_end(key)
+        while len(_ENTRIES) > _MAX:
+            _ENTRIES.popitem(last=False)
+
+
+def stats() -> dict:
+    with _LOCK:
+        return {"hits": _STATS["hits"], "misses": _STATS["misses"], "size": len(_ENTRIES)}
@@ -0,0 +1,94 @@
+# _semantic_cache.py
+"""
+Semantischer Antwort-Cache: fast gleiche Antworten (Embedding-Ähnlichkeit)
+im selben Kontext (Nutzer/Frage/Modus/Motiv/...) liefern den gespeicherten Text.
+Der Kontext enthält immer den Nutzer – Feedback spiegelt die konkrete Antwort
+und darf nie bei einer anderen Person landen.
+
+Einheitsvektoren liegen als eine (N, D)-Matrix vor → Kosinus-Ähnlichkeit aller
+Einträge in einem Matrix-Vektor-Produkt (exakte Suche wie ein Flat-IP-Index;
+bei ≤ 2048 Einträgen schneller als jeder ANN-Index).
+Die Matrix wächst per Verdopplung bis _MAX, danach wird ringförmig (FIFO) überschrieben.
+
+Opt-in (UNDO_SEMANTIC_CACHE=1): jeder Miss kostet vorab einen Embedding-Request,
+Treffer gibt es nur, wenn dieselbe Person dieselbe Frage erneut beantwortet.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+ENABLED = os.getenv("UNDO_SEMANTIC_CACHE", "0") == "1"
+THRESHOLD = float(os.getenv("UNDO_SEMANTIC_THRESHOLD", "0.93"))
+_MAX = 2048
+
+_MATRIX: Optional[np.ndarray] = None        # float32, (Kapazität, D)
+_CTX_IDS: Optional[np.ndarray] = None       # int64, hash(kontext) je Zeile
+_PAYLOADS: List[Tuple[tuple, str]] = []     # (kontext, antworttext) je Zeile
+_COUNT = 0                                  # belegte Zeilen
+_NEXT = 0                                   # nächste Schreibposition
+_LOCK = threading.Lock()
+_STATS = {"hits_high": 0, "hits_low": 0, "misses": 0}
+
+
+def lookup(ctx: tuple, vec: Optional[np.ndarray]) -> Optional[str]:
+    """Gespeicherter Text zum ähnlichsten Vektor im selben Kontext – oder None."""
+    if vec is None:
+        return None
+    with _LOCK:
+        best_sim, best_text = -1.0, None
+        if _COUNT:
+            sims = _MATRIX[:_COUNT] @ vec
+            sims[_CTX_IDS[:_COUNT] != hash(ctx)] = -1.0
+            i = int(sims.argmax())
+            if _PAYLOADS[i][0] == ctx:
+                best_sim, best_text = float(sims[i]), _PAYLOADS[i][1]
+        if best_text is None or best_sim <= THRESHOLD:
+            _STATS["misses"] += 1
+            return None
+        # "high": deutlich über der Schwelle; viele "low"-Treffer → Schwelle eher anheben
+        if best_sim >= (1.0 + THRESHOLD) / 2:
+            _STATS["hits_high"] += 1
+        else:
+            _STATS["hits_low"] += 1
+    return best_text
+
+
+def store(ctx: tuple, vec: Optional[np.ndarray], text: str) -> None:
+    global _MATRIX, _CTX_IDS, _COUNT, _NEXT
+    if vec is None:
+        return
+    with _LOCK:
+        if _MATRIX is None or _MATRIX.shape[1] != vec.shape[0]:
+            _MATRIX = np.empty((64, vec.shape[0]), dtype=np.float32)
+            _CTX_IDS = np.empty(64, dtype=np.int64)
+            _PAYLOADS.clear()
+            _COUNT = _NEXT = 0
+        elif _NEXT == _MATRIX.shape[0] and _NEXT < _MAX:
+            cap = min(_NEXT * 2, _MAX)
+            _MATRIX = np.resize(_MATRIX, (cap, _MATRIX.shape[1]))
+            _CTX_IDS = np.resize(_CTX_IDS, cap)
+
+        i = _NEXT
+        _MATRIX[i] = vec
+        _CTX_IDS[i] = hash(ctx)
+        if i < len(_PAYLOADS):
+            _PAYLOADS[i] = (ctx, text)
+        else:
+            _PAYLOADS.append((ctx, text))
+        _COUNT = max(_COUNT, i + 1)
+        _NEXT = (i + 1) % _MAX
+
+
+def stats() -> dict:
+    with _LOCK:
+        return {
+            **_STATS,
+            "enabled": ENABLED,
+            "threshold": THRESHOLD,
+            "size": _COUNT,
+        }
@@ -1,16 +1,29 @@
 # feedback_engine.py
 import random
+import re
+
+_WORD_RE = re.compile(r"\S+")
+
+
+# Wortanzahl ohne Wortliste; zählt höchstens bis `cap` (reicht für Schwellen-Checks).
+# Auch von pro_feedback_engine genutzt – daher hier im leichten Modul.
+def word_count(s, cap=32):
+    n = 0
+    for _ in _WORD_RE.finditer(s):
+        n += 1
+        if n >= cap:
+            break
+    return n
 
 # Bewertung der Antwortqualität
 def analyze_answer(answer):
-    tokens = answer.lower().split()
-    length = len(tokens)
+    low = answer.lower()
 
-    if length < 10:
+    if word_count(answer, cap=10) < 10:
         return "kurz"
-    elif any(phrase in answer.lower() for phrase in ["weiß nicht", "keine ahnung", "bin mir nicht sicher"]):
+    elif any(phrase in low for phrase in ["weiß nicht", "keine ahnung", "bin mir nicht sicher"]):
         return "unsicher"
-    elif any(phrase in answer.lower() for phrase in ["ich denke", "mir ist aufgefallen", "ich habe erkannt"]):
+    elif any(phrase in low for phrase in ["ich denke", "mir ist aufgefallen", "ich habe erkannt"]):
         return "reflektiert"
     else:
         return "mittel"
@@ -61,7 +74,7 @@ def generate_feedback(answer):
     
     # 🔢 Bewertung der Antwortqualität für Tokens
 def evaluate_tokens(answer):
-    words = len(answer.split())
+    words = word_count(answer, cap=51)
     score = 0
 
     if words > 20:
@@ -1,13 +1,16 @@
 # flask_app.py — Rekonstruiert aus unserem Chat (Drop-in)
 
 from __future__ import annotations
+import json
 import os
+from dotenv import load_dotenv
+load_dotenv(override=False)  # vor den Engine-Imports: pro_feedback_engine liest OPENAI_API_KEY beim Import
 from datetime import datetime, timedelta, date
 import io
 import numpy as np
 
 from flask import flash
-from pro_feedback_engine import require_feature_or_charge, FEATURE
+from pro_feedback_engine import require_feature_or_charge, FEATURE, TOKEN_PRICES
 from PIL import Image, ImageDraw, ImageFont
 from flask import (
     Flask, request, redirect, url_for, render_template,
@@ -37,8 +40,6 @@ import random
 from pro_feedback_engine import ai_generate_question
 
 import re
-from dotenv import load_dotenv
-load_dotenv(override=False)
 
 def _to_second_person(text: str) -> str:
     """Weiche Korrektur in 2. Person (du). Kein perfektes NLP – aber verhindert 'ich'-Ausreißer."""
@@ -152,6 +153,12 @@ _ACTION_WORDS = (
     "Schritt", "konkret", "heute", "morgen", "Woche", "Ziel", "Zeitfenster"
 )
 
+def to_int(x, default=0):
+    try:
+        return int(str(x).strip())
+    except Exception:
+        return default
+
 def _quality_tokens(answer: str) -> int:
     """
     Vergibt 0–3 Tokens basierend auf Antwort-Qualität.
@@ -1042,18 +1049,32 @@ def _user_answered_solo_today(user_id: int, mode: str) -> bool:
                     Reflection.timestamp < end_utc)
             .first()) is not None
 
+def _grant_answer_rewards(route: str, answer: str) -> tuple[int, int]:
+    """
+    Streak- + Qualitätstokens für eine bereits gespeicherte Antwort (eigene Transaktion).
+    Ein Fehler hier wird geloggt und verworfen – die Reflection ist schon committet.
+    Gibt (earned_quality, earned_streak) zurück.
+    """
+    earned_quality = _quality_tokens(answer)
+    try:
+        # --- STREAK-BELONUNG (0/1/2/3 je nach 3/5/7) – flusht ---
+        earned_streak = update_streak_and_grant_tokens(db, current_user, commit=False)
+        # --- QUALITÄTSTOKENS (1–3) ---
+        if earned_quality > 0:
+            current_user.tokens = User.tokens + earned_quality
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"[{route}] Belohnung fehlgeschlagen (Antwort gespeichert):", e)
+        return 0, 0
+    return earned_quality, earned_streak
+
 @app.route("/prompt", methods=["GET", "POST"], endpoint="prompt")
 @login_required
 def prompt():
     import random, re
 
     # --- Helpers ---
-    def to_int(x, default=0):
-        try:
-            return int(str(x).strip())
-        except Exception:
-            return default
-
     def enforce_du(txt: str) -> str:
         t = txt or ""
         # sehr einfache Normalisierung – falls KI „ich“ benutzt
@@ -1101,24 +1122,14 @@ def prompt():
                 return redirect(url_for("feedback_view", rid=last.id, compact=1))
             return redirect(url_for("index"))
 
-        # 3) Extra kostet IMMER 1 Token – harter Server-Check
+        # 3) Extra kostet IMMER 1 Token – Vorab-Check (spart den KI-Call);
+        #    die eigentliche Abbuchung passiert atomar in der Transaktion unten
         if is_extra:
-            user_tokens = to_int(getattr(current_user, "tokens", 0))
-            if user_tokens < 1:
+            if to_int(current_user.tokens) < TOKEN_PRICES[FEATURE.EXTRA_QUESTION]:
                 # Kein Zugriff – Flag entfernen und zurück
                 session.pop("pending_extra", None)
                 session.pop("prompt_q_text", None)
                 return redirect(url_for("index"))
-            # Abbuchen & commit VOR dem Speichern der Reflection
-            current_user.tokens = user_tokens - 1
-            try:
-                db.session.commit()
-            except Exception:
-                db.session.rollback()
-                # Bei Fehler Extra abbrechen
-                session.pop("pending_extra", None)
-                session.pop("prompt_q_text", None)
-                return redirect(url_for("index"))
             # Verbrauchtes Extra-Flag löschen
             session.pop("pending_extra", None)
 
@@ -1128,7 +1139,7 @@ def prompt():
                 fb_text = ai_generate_feedback(
                     shown_text, answer,
                     current_user.motive or "", current_user.chance or "",
-                    mode=current_mode
+                    mode=current_mode, user_key=str(current_user.id)
                 )
             else:
                 fb_text = random.choice([
@@ -1151,25 +1162,23 @@ def prompt():
             mode=current_mode,
             timestamp=datetime.utcnow(),
         )
-        db.session.add(r)
+        # Extra-Abbuchung + Reflection in einer Transaktion (bezahlt ↔ gespeichert)
         try:
+            if is_extra:
+                ok, _msg = require_feature_or_charge(db, current_user, FEATURE.EXTRA_QUESTION, commit=False)
+                if not ok:
+                    db.session.rollback()
+                    session.pop("prompt_q_text", None)
+                    return redirect(url_for("index"))
+            db.session.add(r)
             db.session.commit()
-        except Exception:
+        except Exception as e:
             db.session.rollback()
-            # Wenn das Speichern fehlschlägt, nicht stillschweigend verlieren:
+            print("[prompt] Speichern fehlgeschlagen:", e)
             return redirect(url_for("index"))
 
-        # --- QUALITÄTSTOKENS (1–3) ---
-        earned_quality = _quality_tokens(answer)
-        if earned_quality > 0:
-            current_user.tokens = int(current_user.tokens or 0) + earned_quality
-            db.session.commit()
-
-        # --- STREAK-BELONUNG (0/1/2/3 je nach 3/5/7) ---
-        before = int(current_user.tokens or 0)
-        update_streak_and_grant_tokens(db, current_user)
-        after = int(current_user.tokens or 0)
-        earned_streak = max(0, after - before)
+        # 6) Belohnungen danach – ein Fehler dort kostet nicht die Antwort
+        earned_quality, earned_streak = _grant_answer_rewards("prompt", answer)
 
         # Gesamt an Feedback-View übergeben
         total_earned = earned_quality + earned_streak
@@ -1193,6 +1202,7 @@ def prompt():
             motive=current_user.motive or "",
             chance=current_user.chance or "",
             mode=current_mode,
+            fresh=is_extra,  # Extra-Frage nicht aus dem Tages-Cache (sonst dieselbe wie vorhin)
     )
     # Rendern
     return render_template(
@@ -1575,20 +1585,19 @@ def group_prompt(group_id):
         if _user_answered_group_today(current_user.id, group_id, current_mode) and not is_extra:
             return redirect(url_for("group_overview", group_id=group_id))
 
-        # Extra kostet 1 Token (über Feature-Tabelle) – VOR dem Speichern abbuchen
+        # Extra kostet 1 Token (über Feature-Tabelle) – Vorab-Check spart den KI-Call;
+        # abgebucht wird atomar in der Transaktion unten
         if is_extra:
-            ok, msg = require_feature_or_charge(db, current_user, FEATURE.EXTRA_WEDO)
-            if not ok:
-                session.pop("wedo_pending_extra", None)
-                return redirect(url_for("group_overview", group_id=group_id))
             session.pop("wedo_pending_extra", None)  # Verbrauchtes Flag löschen
+            if to_int(current_user.tokens) < TOKEN_PRICES[FEATURE.EXTRA_WEDO]:
+                return redirect(url_for("group_overview", group_id=group_id))
 
         # Feedback (WeDo → „ihr“-Form)
         if is_pro(current_user):
             fb = ai_generate_feedback(
                 shown_text, answer,
                 current_user.motive or "", current_user.chance or "",
-                mode=current_mode, audience="wedo"
+                mode=current_mode, audience="wedo", user_key=str(current_user.id)
             ).replace("UNDO-Impuls:", "WeDo-Impuls:")
         else:
             fb = "Klar und machbar halten – ein kleiner Schritt, den ihr heute sichtbar macht."
@@ -1604,20 +1613,22 @@ def group_prompt(group_id):
             mode=current_mode,
             timestamp=datetime.utcnow(),
         )
-        db.session.add(r)
-        db.session.commit()
-
-        # Qualitätstokens (1–3) hinzufügen
-        earned_quality = _quality_tokens(answer)
-        if earned_quality > 0:
-            current_user.tokens = int(current_user.tokens or 0) + earned_quality
+        # Extra-Abbuchung + Reflection in einer Transaktion (bezahlt ↔ gespeichert)
+        try:
+            if is_extra:
+                ok, _msg = require_feature_or_charge(db, current_user, FEATURE.EXTRA_WEDO, commit=False)
+                if not ok:
+                    db.session.rollback()
+                    return redirect(url_for("group_overview", group_id=group_id))
+            db.session.add(r)
             db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print("[group_prompt] Speichern fehlgeschlagen:", e)
+            return redirect(url_for("group_overview", group_id=group_id))
 
-        # Streak-Belohnung
-        before = int(current_user.tokens or 0)
-        update_streak_and_grant_tokens(db, current_user)
-        after = int(current_user.tokens or 0)
-        earned_streak = max(0, after - before)
+        # Belohnungen danach – ein Fehler dort kostet nicht die Antwort
+        earned_quality, earned_streak = _grant_answer_rewards("group_prompt", answer)
 
         total_earned = earned_quality + earned_streak
         return redirect(url_for("feedback_view", rid=r.id, compact=1, earned=total_earned))
@@ -1628,7 +1639,8 @@ def group_prompt(group_id):
         q = ai_generate_group_question(
             motive=getattr(g, "motive", None),
             chance=getattr(g, "chance", None),
-            mode=current_mode
+            mode=current_mode,
+            fresh=is_extra,  # Extra-Frage nicht aus dem Tages-Cache
         )
     except Exception as e:
         # Hilfreiches Logging, falls der KI-Call fehlschlägt (typisch: fehlender OPENAI_API_KEY)
@@ -1810,6 +1822,96 @@ def migrate_groups_columns():
 
         print("Migration done.")
 
+@app.cli.command("migrate-question-tips")
+def migrate_question_tips():
+    """
+    Wandelt 'question.suggested_tips' (Pipe-/JSON-Text) einmalig in JSON um (idempotent).
+    Postgres: Spaltentyp danach auf JSONB umstellen.
+    """
+    import json
+    from sqlalchemy import text
+    from models import db, parse_tips
+    with db.engine.begin() as conn:
+        is_pg = conn.dialect.name == "postgresql"
+        if is_pg:
+            coltype = conn.execute(text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = 'question' AND column_name = 'suggested_tips'"
+            )).scalar()
+            if coltype == "jsonb":
+                print("Already JSONB – nothing to do.")
+                return
+
+        rows = conn.execute(text("SELECT id, suggested_tips FROM question")).fetchall()
+        changed = 0
+        for qid, raw in rows:
+            if raw is None:
+                continue
+            if isinstance(raw, str):
+                try:
+                    if isinstance(json.loads(raw), list):
+                        continue  # schon JSON-Liste
+                except ValueError:
+                    pass
+            conn.execute(
+                text("UPDATE question SET suggested_tips = :tips WHERE id = :id"),
+                {"tips": json.dumps(parse_tips(raw), ensure_ascii=False), "id": qid},
+            )
+            changed += 1
+        print(f"Converted rows: {changed}")
+
+        if is_pg:
+            conn.execute(text(
+                "ALTER TABLE question ALTER COLUMN suggested_tips TYPE JSONB "
+                "USING suggested_tips::jsonb"
+            ))
+            print("Column type: JSONB")
+
+        print("Migration done.")
+
+@app.cli.command("migrate-user-counters")
+def migrate_user_counters():
+    """
+    'user.tokens' / 'user.streak': NULL → 0 (idempotent).
+    Postgres: danach DEFAULT 0 + NOT NULL setzen (SQLite kann das nicht per ALTER).
+    """
+    from sqlalchemy import text
+    from models import db
+    with db.engine.begin() as conn:
+        for col in ("tokens", "streak"):
+            n = conn.execute(text(f'UPDATE "user" SET {col} = 0 WHERE {col} IS NULL')).rowcount
+            print(f"{col}: {n} NULL-Werte auf 0 gesetzt")
+            if conn.dialect.name == "postgresql":
+                conn.execute(text(f'ALTER TABLE "user" ALTER COLUMN {col} SET DEFAULT 0'))
+                conn.execute(text(f'ALTER TABLE "user" ALTER COLUMN {col} SET NOT NULL'))
+                print(f"{col}: DEFAULT 0, NOT NULL")
+
+        print("Migration done.")
+
+@app.cli.command("migrate-reflection-date")
+def migrate_reflection_date():
+    """
+    'user.last_reflection_date': DateTime → Date (idempotent).
+    Postgres: Spaltentyp auf DATE umstellen. SQLite: Werte auf 'YYYY-MM-DD' kürzen.
+    """
+    from sqlalchemy import text
+    from models import db
+    with db.engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(
+                'ALTER TABLE "user" ALTER COLUMN last_reflection_date TYPE DATE '
+                "USING last_reflection_date::date"
+            ))
+            print("Column type: DATE")
+        else:
+            n = conn.execute(text(
+                'UPDATE "user" SET last_reflection_date = date(last_reflection_date) '
+                "WHERE last_reflection_date IS NOT NULL AND length(last_reflection_date) > 10"
+            )).rowcount
+            print(f"last_reflection_date: {n} Werte auf Datum gekürzt")
+
+        print("Migration done.")
+
 # =========================
 # Start
 # =========================
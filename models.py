@@ -1,6 +1,11 @@
 # models.py
+import csv
+import io
+import json
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from flask_login import UserMixin
 import uuid 
 
@@ -21,13 +26,13 @@ class User(db.Model, UserMixin):
 
     # Abo/Rewards
     subscription = db.Column(db.String(20))
-    tokens = db.Column(db.Integer, default=0)
-    streak = db.Column(db.Integer, default=0)
+    tokens = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    streak = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     streak_count = db.Column(db.Integer, default=0)
 
     # Aktivität
     last_active = db.Column(db.DateTime, default=datetime.utcnow)
-    last_reflection_date = db.Column(db.DateTime)
+    last_reflection_date = db.Column(db.Date)  # nur der Tag zählt für die Streak
 
     # Persönliche Daten / Onboarding
     first_name = db.Column(db.String(100))
@@ -42,6 +47,22 @@ class User(db.Model, UserMixin):
     promo_code_id = db.Column(db.Integer, db.ForeignKey("promo_codes.id"), nullable=True)
     promo_code = db.relationship("PromoCode", back_populates="users")
 
+    @property
+    def pro_until_dt(self):
+        """pro_until als datetime; Text-Altbestände (SQLite) einmal geparst und am Objekt gecacht."""
+        raw = self.pro_until
+        if raw is None or isinstance(raw, datetime):
+            return raw
+        cached = self.__dict__.get("_pro_until_parsed")
+        if cached is not None and cached[0] == raw:
+            return cached[1]
+        try:
+            parsed = datetime.fromisoformat(raw)
+        except (TypeError, ValueError):
+            parsed = None
+        self.__dict__["_pro_until_parsed"] = (raw, parsed)
+        return parsed
+
     def __repr__(self):
         return f"<User {self.id}:{self.username}>"
 
@@ -114,8 +135,8 @@ class Question(db.Model):
     # Fragetext (einzigartig)
     text = db.Column(db.Text, nullable=False, unique=True)
 
-    # Pipe- oder JSON-String mit 2–5 Hinweisen (regelbasiertes Feedback)
-    suggested_tips = db.Column(db.Text)
+    # Liste mit 2–5 Hinweisen (regelbasiertes Feedback); Postgres: JSONB, sonst JSON
+    suggested_tips = db.Column(JSON().with_variant(JSONB, "postgresql"))
 
     def __repr__(self):
         return f"<Question {self.id} [{self.category}/{self.mode}] d={self.difficulty}>"
@@ -173,4 +194,64 @@ class PromoCode(db.Model):
     max_uses = db.Column(db.Integer, nullable=True)    # None = unbegrenzt
     used_count = db.Column(db.Integer, default=0, nullable=False)
     note = db.Column(db.String(200))
-    users = db.relationship("User", back_populates="promo_code")
\ No newline at end of file
+    users = db.relationship("User", back_populates="promo_code")
+
+# ---------------------------
+# Seeding (Fragen-Engine)
+# ---------------------------
+def parse_tips(raw) -> list[str]:
+    """Altformat (Pipe- oder JSON-String) → Liste von Hinweisen."""
+    if raw is None:
+        return []
+    if isinstance(raw, (list, tuple)):
+        return [str(t).strip() for t in raw if str(t).strip()]
+    s = str(raw).strip()
+    if not s:
+        return []
+    if s.startswith("["):
+        try:
+            return parse_tips(json.loads(s))
+        except ValueError:
+            pass
+    return [t.strip() for t in s.split("|") if t.strip()]
+
+_QUESTION_COPY_COLS = ("category", "subcategory", "difficulty", "mode", "text", "suggested_tips")
+
+def bulk_seed_questions(db, rows: list[dict]) -> int:
+    """
+    Erstbefüllung der Tabelle 'question' in einem Rutsch.
+    Postgres: COPY FROM STDIN (ohne synchronen Commit), sonst bulk_insert_mappings.
+    Gibt die Anzahl eingefügter Zeilen zurück.
+    """
+    if not rows:
+        return 0
+    # COPY umgeht die Python-Defaults der Spalten → hier explizit setzen
+    rows = [{"difficulty": 1, "mode": "any", **r} for r in rows]
+    for r in rows:
+        r["suggested_tips"] = parse_tips(r.get("suggested_tips"))
+
+    try:
+        if db.engine.dialect.name == "postgresql":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            for r in rows:
+                writer.writerow([
+                    json.dumps(r[c], ensure_ascii=False) if c == "suggested_tips" else r.get(c)
+                    for c in _QUESTION_COPY_COLS
+                ])
+            buf.seek(0)
+
+            conn = db.session.connection()
+            conn.exec_driver_sql("SET LOCAL synchronous_commit = OFF")
+            cur = conn.connection.cursor()
+            cur.copy_expert(
+                f"COPY question ({', '.join(_QUESTION_COPY_COLS)}) FROM STDIN WITH (FORMAT csv)",
+                buf,
+            )
+        else:
+            db.session.bulk_insert_mappings(Question, rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
@@ -9,23 +9,71 @@ Enthält:
 - GPT-Feedback (gpt-4o-mini) + Wochen-/Monats-Report + Antwortvergleich
 - Gruppen-Fragegenerator (WeDo) + Solo-Fragegenerator
 - Robuste Fallbacks ohne KI
+
+Flask-Integration (Helfer flushen nur; Antwort und Belohnung in zwei Transaktionen,
+damit ein Fehler bei der Belohnung nie die Antwort kostet – vgl. flask_app._grant_answer_rewards):
+
+    # 1) Abbuchung + Antwort: bezahlt ↔ gespeichert
+    try:
+        ok, msg = require_feature_or_charge(db, current_user, FEATURE.EXTRA_WEDO, commit=False)
+        if not ok:
+            db.session.rollback()
+            return redirect(...)
+        db.session.add(reflection)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return redirect(...)
+
+    # 2) Belohnung: Fehler loggen und verwerfen – die Antwort ist schon committet
+    try:
+        earned = update_streak_and_grant_tokens(db, current_user, commit=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        earned = 0
+
+Langsame KI-Calls gehören VOR die Transaktionen (keine offenen Row-Locks während HTTP).
 """
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import json
 import os
 import re
-import time
 import random
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Tuple, List
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from enum import StrEnum
+from functools import lru_cache
+from types import MappingProxyType
+from typing import AsyncIterator, Callable, Final, Iterable, Iterator, Mapping, NamedTuple, Optional, Tuple, List
+
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+
+import _llm_cache
+import _semantic_cache
+from feedback_engine import word_count as _wc  # Wortanzahl mit Obergrenze (leichtes Modul)
 
 # OpenAI (neues SDK)
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import (
+        APIConnectionError, AsyncOpenAI, InternalServerError, OpenAI, RateLimitError,
+    )
+    # Vorübergehende Fehler (Netz/Timeout, 429, 5xx) – alles andere (Auth, 400, …) ist ein echter Bug
+    _TRANSIENT_ERRORS: tuple = (APIConnectionError, RateLimitError, InternalServerError)
 except Exception:
-    OpenAI = None  # SDK nicht installiert
+    OpenAI = AsyncOpenAI = None  # SDK nicht installiert
+    _TRANSIENT_ERRORS = ()
 
 # ------------------------------------------------------------
 # Export-Liste (für "from pro_feedback_engine import *")
@@ -33,15 +81,34 @@ except Exception:
 __all__ = [
     "is_pro",
     "FEATURE",
+    "FeatureSpec",
+    "FEATURE_SPEC",
     "require_feature_or_charge",
     "update_streak_and_grant_tokens",
     "ai_generate_feedback",
+    "ai_generate_feedback_async",
+    "ai_generate_feedback_stream",
+    "ai_generate_feedback_stream_async",
+    "collect_feedback_stream",
     "ai_generate_group_feedback",
+    "ai_generate_group_feedback_async",
+    "ai_generate_feedback_batch",
+    "ai_generate_feedback_many",
     "ai_weekly_report",
+    "ai_weekly_report_async",
+    "batch_weekly_reports",
+    "submit_weekly_reports_batch",
+    "collect_weekly_reports_batch",
     "ai_monthly_report",
+    "ai_monthly_report_async",
     "ai_answer_compare",
+    "ai_answer_compare_async",
     "ai_generate_question",
+    "ai_generate_question_async",
+    "ai_generate_questions_bulk",
     "ai_generate_group_question",
+    "ai_generate_group_question_async",
+    "ai_cache_stats",
 ]
 
 logger = logging.getLogger(__name__)
@@ -63,88 +130,389 @@ SYSTEM_WEDO = (
 # ------------------------------------------------------------
 # OpenAI Helper
 # ------------------------------------------------------------
+# Ohne Key/SDK (Dev/Test) liefern alle ai_* direkt ihren Fallback – ohne Prompts zu bauen.
+# Je Aufruf geprüft: ein später gesetzter Key (load_dotenv nach dem Import, Rotation) greift sofort.
+def _ai_available() -> bool:
+    return OpenAI is not None and bool(os.getenv("OPENAI_API_KEY"))
+
+
+# Feste Request-Parameter je Call-Typ (einmal beim Import gebaut; nur "messages" variiert).
+# max_tokens knapp über der im Prompt verlangten Länge; Stop-Sequenzen schneiden
+# angehängte Meta-Blöcke ab.
+# Fragen kommen im JSON-Modus – dort kein Zeilen-Stop (JSON darf umbrechen).
+_STOP_TEXT = ["\n\n\n", "\n\nFeedback:", "\n\n---"]  # "\n\n\n": Text ist fertig, Rest wäre Füllstoff
+_REQ_FEEDBACK = MappingProxyType(
+    {"model": "gpt-4o-mini", "temperature": 0.5, "max_tokens": 180, "stop": _STOP_TEXT}
+)
+_REQ_WEEKLY = MappingProxyType(
+    {"model": "gpt-4o-mini", "temperature": 0.5, "max_tokens": 200, "stop": _STOP_TEXT}
+)
+_REQ_MONTHLY = MappingProxyType(
+    {"model": "gpt-4o-mini", "temperature": 0.5, "max_tokens": 240, "stop": _STOP_TEXT}
+)
+_REQ_COMPARE = MappingProxyType(
+    {"model": "gpt-4o-mini", "temperature": 0.55, "max_tokens": 120, "stop": _STOP_TEXT}
+)
+# Obergrenze paralleler Requests in den *_many/batch_*-Helfern (Rate-Limit-Schutz);
+# Semaphore wird je Aufruf im laufenden Event-Loop erzeugt.
+_AI_CONCURRENCY = 10
+
+_JSON_OBJECT = MappingProxyType({"type": "json_object"})
+_REQ_GROUP_QUESTION = MappingProxyType(
+    {"model": "gpt-4o-mini", "temperature": 0.55, "max_tokens": 48, "response_format": _JSON_OBJECT}
+)
+_REQ_SOLO_QUESTION = MappingProxyType(
+    {"model": "gpt-4o-mini", "temperature": 0.4, "max_tokens": 44, "response_format": _JSON_OBJECT}
+)
+
+# Harte Timeouts je Phase (bricht hängende Requests wirklich ab); Retries/Backoff macht das SDK
+_OPENAI_TIMEOUT = httpx.Timeout(connect=2.0, read=6.0, write=3.0, pool=1.0) if OpenAI is not None else None
+# Sammel-Requests (bis 1800 max_tokens) liefern ohne Streaming erst am Ende Bytes → längeres read
+_OPENAI_TIMEOUT_BATCH = httpx.Timeout(connect=2.0, read=30.0, write=3.0, pool=1.0) if OpenAI is not None else None
+
+# Ein Client pro Prozess → Connection-Pool/TLS werden über alle ai_* (und Threads) hinweg
+# wiederverwendet. Key/Base-URL kommen aus .env und ändern sich zur Laufzeit nicht.
+_CLIENT: "Optional[OpenAI]" = None
+_CLIENT_LOCK = threading.Lock()
+_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32) if OpenAI is not None else None
+
+
 def _ensure_openai_client() -> "OpenAI":
-    """Erzeugt einen OpenAI-Client oder wirft RuntimeError, wenn Key/SDK fehlt."""
+    """Liefert den gemeinsamen OpenAI-Client oder wirft RuntimeError, wenn Key/SDK fehlt."""
+    global _CLIENT
+    if _CLIENT is not None:
+        return _CLIENT
     if OpenAI is None:
         raise RuntimeError("OpenAI SDK nicht installiert. `pip install openai>=1.40`")
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY fehlt (in .env/Umgebung setzen).")
-    return OpenAI(api_key=api_key)
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = OpenAI(
+                api_key=api_key,
+                base_url=os.getenv("OPENAI_BASE_URL") or None,
+                timeout=_OPENAI_TIMEOUT,
+                max_retries=2,
+                http_client=httpx.Client(limits=_POOL_LIMITS),
+            )
+    return _CLIENT
 
 
-def _call_openai_safe(fn, *, max_retries: int = 2, timeout_s: float = 7.0, fallback_text: Optional[str] = None) -> str:
+def _reset_client() -> None:
     """
-    Führt eine OpenAI-Operation robust aus:
-    - Soft-Timeout je Aufruf
-    - wenige Retries bei flüchtigen Fehlern
-    - bei Fehlern -> fallback_text (falls gesetzt), sonst Exception
+    Schließt und verwirft den gemeinsamen Sync-Client (Tests, rotierter Key); der nächste Aufruf
+    baut neu. Async-Clients leben nur je Aufruf/Sammel-Helfer und brauchen hier nichts.
     """
-    last_err = None
-    for _ in range(max_retries + 1):
-        start = time.time()
+    global _CLIENT
+    with _CLIENT_LOCK:
+        client, _CLIENT = _CLIENT, None
+    if client is not None:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+
+@atexit.register
+def _close_openai_clients() -> None:
+    if _CLIENT is None:
+        return
+    try:
+        _CLIENT.close()
+    except Exception:
+        pass
+
+
+# AsyncOpenAI: der httpx-Pool gehört zu dem Event-Loop, in dem er Verbindungen geöffnet hat
+# (jeder asyncio.run(), z. B. Cron, hat einen neuen Loop). Deshalb gibt es keinen globalen
+# Async-Client: wer einen öffnet, schließt ihn auch wieder (async with).
+# Die Sammel-Helfer (batch_weekly_reports, ai_generate_feedback_many) öffnen EINEN Client
+# für alle ihre Aufgaben (_async_client_scope); Einzelaufrufe außerhalb nutzen einen eigenen.
+_ASYNC_CLIENT: "ContextVar[Optional[AsyncOpenAI]]" = ContextVar("undo_async_openai_client", default=None)
+
+
+def _new_async_openai_client() -> "AsyncOpenAI":
+    """Neuer AsyncOpenAI-Client (Aufrufer schließt ihn); wirft RuntimeError, wenn Key/SDK fehlt."""
+    if AsyncOpenAI is None:
+        raise RuntimeError("OpenAI SDK nicht installiert. `pip install openai>=1.40`")
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY fehlt (in .env/Umgebung setzen).")
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        timeout=_OPENAI_TIMEOUT,
+        max_retries=2,
+        http_client=httpx.AsyncClient(limits=_POOL_LIMITS),
+    )
+
+
+@asynccontextmanager
+async def _async_openai_client() -> AsyncIterator["AsyncOpenAI"]:
+    """Client des umgebenden Sammel-Helfers – sonst ein eigener, der danach geschlossen wird."""
+    client = _ASYNC_CLIENT.get()
+    if client is not None:
+        yield client
+        return
+    async with _new_async_openai_client() as client:
+        yield client
+
+
+@asynccontextmanager
+async def _async_client_scope() -> AsyncIterator[None]:
+    """Ein gemeinsamer Client für alle darin gestarteten Aufgaben (gather erbt den Kontext)."""
+    if _ASYNC_CLIENT.get() is not None or not _ai_available():
+        yield
+        return
+    try:
+        client = _new_async_openai_client()
+    except RuntimeError:  # Key/SDK fehlt → jeder Aufruf liefert ohnehin seinen Fallback
+        yield
+        return
+    async with client:
+        token = _ASYNC_CLIENT.set(client)
         try:
-            return fn()
-        except Exception as e:
-            last_err = e
-            time.sleep(0.08 + random.random() * 0.18)  # kleiner Backoff
+            yield
         finally:
-            if (time.time() - start) > timeout_s:
-                last_err = TimeoutError("OpenAI call exceeded soft timeout")
-    if fallback_text is not None:
-        return fallback_text
-    raise last_err if last_err else RuntimeError("OpenAI call failed")
+            _ASYNC_CLIENT.reset(token)
+
+
+def _log_rejected(e: Exception) -> None:
+    """
+    Nicht vorübergehende Fehler (Auth, ungültiger Request, …) loggen – sonst verschwinden sie
+    hinter den Fallbacks der Aufrufer. Timeout + Retries für Netz/429/5xx übernimmt der Client
+    (max_retries, Backoff mit Jitter, Retry-After); was danach noch scheitert, bleibt ungeloggt.
+    """
+    if not isinstance(e, _TRANSIENT_ERRORS) and getattr(e, "status_code", None) is not None:
+        logger.error("OpenAI-Request abgelehnt (%s): %s", type(e).__name__, e)
+
+
+def _create(client, req: Mapping, messages: list):
+    """chat.completions.create() mit Logging abgelehnter Requests (Fehler gehen weiter an den Aufrufer)."""
+    try:
+        return client.chat.completions.create(**req, messages=messages)
+    except Exception as e:
+        _log_rejected(e)
+        raise
+
+
+async def _create_async(client, req: Mapping, messages: list):
+    """Async-Gegenstück zu _create."""
+    try:
+        return await client.chat.completions.create(**req, messages=messages)
+    except Exception as e:
+        _log_rejected(e)
+        raise
+
+
+def _chat(
+    client,
+    req: Mapping,
+    messages: list,
+    post: Callable[[object], str],
+    semantic: Optional[Tuple[tuple, str]] = None,
+) -> str:
+    """
+    create() + Nachbearbeitung über den exakten Antwort-Cache (_llm_cache).
+    `semantic=(kontext, text)`: bei exaktem Miss zuerst im semantischen Cache nachsehen
+    (nur wenn _semantic_cache.ENABLED).
+    `post` wirft bei unbrauchbarer Antwort → nichts wird gespeichert.
+    """
+    key = _llm_cache.key_for(req, messages)
+    text = _llm_cache.get(key)
+    if text is not None:
+        return text
+    vec = None
+    if not _semantic_cache.ENABLED:
+        semantic = None
+    if semantic is not None:
+        vec = _embed(semantic[1])
+        text = _semantic_cache.lookup(semantic[0], vec)
+        if text is not None:
+            return text
+    text = post(_create(client, req, messages))
+    _llm_cache.put(key, text)
+    if semantic is not None:
+        _semantic_cache.store(semantic[0], vec, text)
+    return text
+
+
+async def _chat_async(client, req: Mapping, messages: list, post: Callable[[object], str]) -> str:
+    """Async-Gegenstück zu _chat (gleicher Cache)."""
+    key = _llm_cache.key_for(req, messages)
+    text = _llm_cache.get(key)
+    if text is None:
+        text = post(await _create_async(client, req, messages))
+        _llm_cache.put(key, text)
+    return text
+
+
+# ------------------------------------------------------------
+# Antwort-Cache (exakt + semantisch)
+# ------------------------------------------------------------
+# Stufe 1: exakte Treffer über _llm_cache (LRU + TTL, Schlüssel = Request + Messages), siehe _chat.
+# Stufe 2: fast gleiche Antworten (Embedding-Ähnlichkeit) im selben Kontext (Nutzer/Frage/Modus/...),
+#          siehe _semantic_cache.py; hier nur das Embedding. Nur mit user_key – ein Treffer
+#          spiegelt sonst womöglich die Antwort einer anderen Person – und nur mit
+#          UNDO_SEMANTIC_CACHE=1 (Embedding-Request vor jedem Miss, Treffer nur bei Re-Submits).
+_EMBED_MODEL = "text-embedding-3-small"
+# Embedding liegt vor dem eigentlichen Call → hart gedeckelt, ohne Retries;
+# nach Fehler/Timeout eine Weile ganz ohne semantischen Cache
+_EMBED_TIMEOUT = httpx.Timeout(connect=1.0, read=1.5, write=1.0, pool=0.5) if OpenAI is not None else None
+_EMBED_PAUSE = 60.0
+_embed_paused_until = 0.0
+
+
+def _norm(text: str | None) -> str:
+    """Whitespace-normalisiert (Cache-Schlüssel; Groß-/Kleinschreibung bleibt für den Prompt erhalten)."""
+    return " ".join((text or "").split())
+
+
+def _embed_many(texts: List[str]) -> List[Optional[np.ndarray]]:
+    """Normierte Embeddings in einem Request – je Text None, wenn nicht verfügbar (dann ohne semantischen Cache)."""
+    global _embed_paused_until
+    if not texts or time.monotonic() < _embed_paused_until:
+        return [None] * len(texts)
+    try:
+        client = _ensure_openai_client().with_options(timeout=_EMBED_TIMEOUT, max_retries=0)
+        resp = client.embeddings.create(model=_EMBED_MODEL, input=texts)
+    except Exception:
+        _embed_paused_until = time.monotonic() + _EMBED_PAUSE
+        return [None] * len(texts)
+    out: List[Optional[np.ndarray]] = []
+    for item in resp.data:
+        vec = np.asarray(item.embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        out.append(vec / norm if norm else None)
+    return out
+
+
+def _embed(text: str) -> Optional[np.ndarray]:
+    return _embed_many([text])[0]
+
+
+def ai_cache_stats() -> dict:
+    """Trefferzähler beider Cache-Stufen (zum Nachjustieren von UNDO_SEMANTIC_THRESHOLD)."""
+    # Fragen laufen tagesgebunden über eigene lru_caches, nicht über _llm_cache
+    questions = [_solo_question_cached, _group_question_cached]
+    return {
+        "response_cache": _llm_cache.stats(),
+        "question_hits": sum(f.cache_info().hits for f in questions),
+        "question_misses": sum(f.cache_info().misses for f in questions),
+        **{f"semantic_{k}": v for k, v in _semantic_cache.stats().items()},
+    }
 
 
 # ------------------------------------------------------------
 # Feature-Definition & Preise
 # ------------------------------------------------------------
-class FEATURE:
-    """Enum-ähnliche Sammlung der Feature-Keys."""
+class FEATURE(StrEnum):
+    """Feature-Keys (StrEnum → vergleichbar mit den bisherigen Strings)."""
     WEDO = "wedo"                          # Nur Pro
     RADAR = "radar"                        # Pro inkl.; Free: 3 Tokens pro Nutzung
     ANSWER_COMPARE = "answer_compare"      # Nach 1 Woche: beide 1 Token
     EXTRA_QUESTION = "extra_question"      # Beide 1 Token
     WEEKLY_REPORT = "weekly_report"        # Pro frei, Free: 2 Tokens
-    MONTHLY_REPORT = "monthly_report"      # Pro frei, Free: 4 Tokens
+    MONTHLY_REPORT = "monthly_report"      # Pro frei, Free: 3 Tokens
     EXTRA_WEDO = "extra_wedo"
 
-TOKEN_PRICES = {
-    FEATURE.RADAR: 3,           # Free
-    FEATURE.ANSWER_COMPARE: 1,  # Pro/Free beide 1
-    FEATURE.EXTRA_QUESTION: 1,  # Pro/Free beide 1
-    FEATURE.WEEKLY_REPORT: 2,   # Free
-    FEATURE.MONTHLY_REPORT: 3,  # Free
-    FEATURE.EXTRA_WEDO: 1,
-}
-
-PRO_FREE = {
-    FEATURE.WEDO: "pro_only",               # nur Pro
-    FEATURE.RADAR: "included_in_pro",       # Pro 0 Token, Free: 3 Tokens
-    FEATURE.ANSWER_COMPARE: "token_for_both",
-    FEATURE.EXTRA_QUESTION: "token_for_both",
-    FEATURE.WEEKLY_REPORT: "included_in_pro",
-    FEATURE.MONTHLY_REPORT: "included_in_pro",
-    FEATURE.EXTRA_WEDO: "token_for_both",
-}
+class FeatureSpec(NamedTuple):
+    """Regel + Tokenpreis eines Features (ein Eintrag statt zwei paralleler Dicts)."""
+    rule: str   # "pro_only" | "included_in_pro" | "token_for_both" | "free"
+    price: int  # Tokens, wenn die Regel einen Preis verlangt
+
+
+# Eine Tabelle für Regel + Preis. Nur hier pflegen.
+FEATURE_SPEC: Final[Mapping[str, FeatureSpec]] = MappingProxyType({
+    FEATURE.WEDO: FeatureSpec("pro_only", 0),                  # nur Pro
+    FEATURE.RADAR: FeatureSpec("included_in_pro", 3),          # Pro 0 Token, Free: 3 Tokens
+    FEATURE.ANSWER_COMPARE: FeatureSpec("token_for_both", 1),  # Pro/Free beide 1
+    FEATURE.EXTRA_QUESTION: FeatureSpec("token_for_both", 1),  # Pro/Free beide 1
+    FEATURE.WEEKLY_REPORT: FeatureSpec("included_in_pro", 2),  # Free
+    FEATURE.MONTHLY_REPORT: FeatureSpec("included_in_pro", 3), # Free
+    FEATURE.EXTRA_WEDO: FeatureSpec("token_for_both", 1),
+})
+_NO_SPEC = FeatureSpec("free", 0)
+
+# Abgeleitete Sichten (schreibgeschützt) für bestehende Leser
+TOKEN_PRICES: Final[Mapping[str, int]] = MappingProxyType(
+    {f: spec.price for f, spec in FEATURE_SPEC.items() if spec.price}
+)
+PRO_FREE: Final[Mapping[str, str]] = MappingProxyType(
+    {f: spec.rule for f, spec in FEATURE_SPEC.items()}
+)
+assert TOKEN_PRICES[FEATURE.MONTHLY_REPORT] == 3  # kanonischer Preis (ältere Stände hatten 3 vs. 4)
 
 # ------------------------------------------------------------
 # Utility
 # ------------------------------------------------------------
-def is_pro(user) -> bool:
-    """Prüft, ob Pro aktiv ist – via user.subscription == 'pro' ODER Zeitfenster user.pro_until."""
+@lru_cache(maxsize=8192)
+def _parse_until(s: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(s)
+    except Exception:
+        return None
+
+
+# (user.id, subscription, pro_until) -> (gültig_bis_monotonic, ergebnis).
+# Abo-Status ändert sich selten; 60 s Verzögerung beim Ablauf sind vertretbar.
+_PRO_TTL = 60.0
+_PRO_CACHE_MAX = 8192
+_PRO_CACHE: dict[tuple, tuple[float, bool]] = {}
+
+
+def _pro_until(user) -> Optional[datetime]:
+    """pro_until als datetime – beim User-Modell geparst und am Objekt gecacht (pro_until_dt)."""
+    try:
+        return user.pro_until_dt  # None heißt hier wirklich "kein Pro-Zeitfenster"
+    except AttributeError:
+        # Objekte ohne Model-Property (Altbestand, Test-Doubles)
+        raw = getattr(user, "pro_until", None)
+        return _parse_until(raw) if isinstance(raw, str) else raw
+
+
+def _is_pro_uncached(user, now: Optional[datetime] = None) -> bool:
     if (getattr(user, "subscription", "") or "").lower() == "pro":
         return True
-    until = getattr(user, "pro_until", None)
-    if until:
-        try:
-            if isinstance(until, str):
-                until = datetime.fromisoformat(until)
-        except Exception:
-            until = None
-        if until and until >= datetime.utcnow():
-            return True
-    return False
+    until = _pro_until(user)
+    return bool(until) and until >= (now or datetime.now(timezone.utc).replace(tzinfo=None))
+
+
+def is_pro(user, now: Optional[datetime] = None) -> bool:
+    """
+    Prüft, ob Pro aktiv ist – via user.subscription == 'pro' ODER Zeitfenster user.pro_until.
+    `now` (naive UTC) erlaubt einen Zeitpunkt für den ganzen Request; dann ohne TTL-Cache.
+    """
+    try:
+        key = (user.id, user.subscription, user.pro_until)
+    except AttributeError:  # z. B. AnonymousUser ohne Pro-Spalten
+        return _is_pro_uncached(user, now)
+    if now is not None or key[0] is None:
+        return _is_pro_uncached(user, now)
+
+    mono = time.monotonic()
+    hit = _PRO_CACHE.get(key)
+    if hit is not None and mono < hit[0]:
+        return hit[1]
+    result = _is_pro_uncached(user)
+    if len(_PRO_CACHE) >= _PRO_CACHE_MAX:
+        _PRO_CACHE.clear()
+    _PRO_CACHE[key] = (mono + _PRO_TTL, result)
+    return result
+
+
+# (rule, is_pro) -> (allowed, preis_aus_tabelle, reason); einmalig beim Import aufgebaut
+_GATE = {
+    ("pro_only", True): (True, False, "Pro-only Feature freigeschaltet."),
+    ("pro_only", False): (False, False, "Dieses Feature ist nur in UNDO Pro verfügbar."),
+    ("included_in_pro", True): (True, False, "In Pro enthalten."),
+    ("included_in_pro", False): (True, True, "In Free via Tokens."),
+    ("token_for_both", True): (True, True, "Token erforderlich."),
+    ("token_for_both", False): (True, True, "Token erforderlich."),
+    ("free", True): (True, False, "Kein Preis hinterlegt."),
+    ("free", False): (True, False, "Kein Preis hinterlegt."),
+}
 
 
 def feature_cost_for_user(user, feature: str) -> Tuple[bool, int, str]:
@@ -153,28 +521,17 @@ def feature_cost_for_user(user, feature: str) -> Tuple[bool, int, str]:
     - allowed = False, wenn z. B. WEDO in Free.
     - token_cost = 0..n
     """
-    rule = PRO_FREE.get(feature)
+    spec = FEATURE_SPEC.get(feature, _NO_SPEC)
+    allowed, priced, reason = _GATE[(spec.rule, is_pro(user))]
+    return allowed, (spec.price if priced else 0), reason
 
-    if rule == "pro_only":
-        if is_pro(user):
-            return True, 0, "Pro-only Feature freigeschaltet."
-        return False, 0, "Dieses Feature ist nur in UNDO Pro verfügbar."
 
-    if rule == "included_in_pro":
-        if is_pro(user):
-            return True, 0, "In Pro enthalten."
-        return True, TOKEN_PRICES.get(feature, 0), "In Free via Tokens."
-
-    if rule == "token_for_both":
-        return True, TOKEN_PRICES.get(feature, 0), "Token erforderlich."
-
-    return True, 0, "Kein Preis hinterlegt."
-
-
-def require_feature_or_charge(db, user, feature: str) -> Tuple[bool, str]:
+def require_feature_or_charge(db, user, feature: str, *, commit: bool = True) -> Tuple[bool, str]:
     """
     Prüft Freischaltung/Kosten. Zieht Tokens ab, wenn nötig und vorhanden.
-    Commit’t bei Abbuchung. Gibt (ok, message) zurück.
+    Commit’t bei Abbuchung; mit commit=False wird nur geflusht und Fehler
+    gehen ungefangen an den Aufrufer (der die Transaktion besitzt).
+    Gibt (ok, message) zurück.
     """
     allowed, cost, reason = feature_cost_for_user(user, feature)
     if not allowed:
@@ -183,13 +540,31 @@ def require_feature_or_charge(db, user, feature: str) -> Tuple[bool, str]:
     if cost <= 0:
         return True, "OK (kostenlos)"
 
-    current = int(getattr(user, "tokens", 0) or 0)
-    if current < cost:
-        return False, f"Zu wenige Tokens. Benötigt: {cost}."
+    # Atomar in der DB: nur abbuchen, wenn genug Tokens da sind (kein Read-then-Write-Race).
+    # RETURNING liefert den neuen Stand im selben Statement – kein SELECT hinterher.
+    # __class__ statt type(): Flask-Logins current_user ist ein LocalProxy,
+    # der __class__ an das User-Objekt weiterreicht, type() aber nicht
+    model = user.__class__
+    stmt = (
+        update(model)
+        .where(model.id == user.id, model.tokens >= cost)
+        .values(tokens=model.tokens - cost)
+        .returning(model.tokens)
+        .execution_options(synchronize_session=False)
+    )
+    if not commit:
+        new_tokens = db.session.execute(stmt).scalar_one_or_none()
+        if new_tokens is None:
+            return False, f"Zu wenige Tokens. Benötigt: {cost}."
+        set_committed_value(user, "tokens", new_tokens)
+        return True, f"{cost} Token(s) abgebucht."
 
-    user.tokens = current - cost
     try:
-        db.session.commit()
+        new_tokens = db.session.execute(stmt).scalar_one_or_none()
+        if new_tokens is None:
+            # nichts geändert → kein Rollback nötig (würde fremde pending-Änderungen verwerfen)
+            return False, f"Zu wenige Tokens. Benötigt: {cost}."
+        db.session.commit()  # expire_on_commit lädt user.tokens bei Bedarf neu
     except Exception:
         db.session.rollback()
         return False, "Abbuchung fehlgeschlagen."
@@ -199,73 +574,213 @@ def require_feature_or_charge(db, user, feature: str) -> Tuple[bool, str]:
 # ------------------------------------------------------------
 # Streak-Logik (3/5/7 & Reset)
 # ------------------------------------------------------------
-def update_streak_and_grant_tokens(db, user, now: Optional[datetime] = None) -> None:
+_ONE_DAY = timedelta(days=1)
+_STREAK_REWARDS = {3: (1, False), 5: (2, False), 7: (3, True)}  # Streak-Tag -> (Tokens, Reset)
+
+
+def update_streak_and_grant_tokens(
+    db, user, now: Optional[datetime] = None, *, commit: bool = True
+) -> int:
     """
     Aktualisiert Streak basierend auf user.last_reflection_date.
     Belohnungen:
       Tag 3 → +1 Token
       Tag 5 → +2 Tokens
       Tag 7 → +3 Tokens & Streak-Reset auf 0
+    Mit commit=False nur flush() – Commit/Rollback macht der Aufrufer.
+    Gibt die gutgeschriebenen Tokens zurück (0, wenn keine Belohnung).
     """
-    now = now or datetime.utcnow()
+    # naive UTC wie in den DB-Spalten (utcnow ist ab 3.12 deprecated)
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
     today = now.date()
-    last = user.last_reflection_date.date() if getattr(user, "last_reflection_date", None) else None
+    last = user.last_reflection_date  # Date-Spalte → direkt vergleichbar
 
     if last == today:
-        pass
-    elif last == (today - timedelta(days=1)):
-        user.streak = int(getattr(user, "streak", 0) or 0) + 1
-    else:
-        user.streak = 1
+        return 0  # heute schon gezählt → keine Schreibtransaktion
 
-    user.last_reflection_date = now
-
-    earned = 0
-    if user.streak == 3:
-        earned += 1
-    elif user.streak == 5:
-        earned += 2
-    elif user.streak == 7:
-        earned += 3
-        user.streak = 0  # Reset
+    # Einmal lesen, lokal rechnen, einmal zurückschreiben
+    streak = user.streak + 1 if last == today - _ONE_DAY else 1
+    earned, reset = _STREAK_REWARDS.get(streak, (0, False))
+    if reset:
+        streak = 0
 
+    user.streak = streak
+    user.last_reflection_date = today
     if earned:
-        user.tokens = int(getattr(user, "tokens", 0) or 0) + earned
+        # SQL-Ausdruck → "tokens = tokens + :earned" beim Flush (atomar, kein Lost Update)
+        # (__class__ statt type(): current_user ist ein LocalProxy, s. require_feature_or_charge)
+        user.tokens = user.__class__.tokens + earned
 
+    if not commit:
+        db.session.flush()
+        return earned
     try:
         db.session.commit()
     except Exception:
         db.session.rollback()
         raise
+    return earned
 
 
 # ------------------------------------------------------------
 # Fallback-Feedback (regelbasiert, UNDO-Stil)
 # ------------------------------------------------------------
+# Teilstring wie früher (k in ans.lower()): trifft auch „Übermorgen“, „Vormittagsuhr“, „heutigen“
+_FB_TIME_RE = re.compile(r"heute|morgen|uhr", re.IGNORECASE)
+_FB_P1 = "Das ist dir wichtig – und du gehst vorsichtig damit um."
+_FB_IMPULSE = "UNDO-Impuls: Kurz anhalten, atmen, einen machbaren Schritt wählen."
+_FB_P2_TIGHT = "Vielleicht tut es gut, dem Gedanken noch zwei Sätze Raum zu geben."
+_FB_P2_TIME = "Ein kleines Zeitfenster heute kann den Knoten lockern."
+_FB_P2_DEFAULT = "Ein leiser Perspektivwechsel kann tragen."
+
+
 def _fallback_feedback(question_text: str, answer_text: str, motive: str, chance: str) -> str:
     """Kurzes Fallback-Feedback im UNDO-Fließtext-Stil (ohne Listen)."""
     ans = (answer_text or "").strip()
-    tight = len(ans) < 40
-    lacks_time = not any(k in ans.lower() for k in ["heute", "morgen", "uhr"])
+    return _fallback_text(
+        len(ans) < 40,
+        _FB_TIME_RE.search(ans) is None,
+        bool((motive or "").strip()),
+        chance if (chance or "").strip() else "",
+    )
+
 
-    p1 = "Das ist dir wichtig – und du gehst vorsichtig damit um."
-    hint_m = " Dein Warum schimmert mit." if (motive or "").strip() else ""
-    hint_c = f" {chance} bleibt als Richtung spürbar." if (chance or "").strip() else ""
+# Wenige Varianten (4 Schalter; chance ist Profiltext und wiederholt sich je Nutzer) →
+# bei API-Ausfall, wenn der Fallback ständig feuert, kein Neuaufbau pro Request.
+@lru_cache(maxsize=512)
+def _fallback_text(tight: bool, lacks_time: bool, has_motive: bool, chance: str) -> str:
+    hint_m = " Dein Warum schimmert mit." if has_motive else ""
+    hint_c = f" {chance} bleibt als Richtung spürbar." if chance else ""
 
-    p2_parts: List[str] = []
-    if tight:
-        p2_parts.append("Vielleicht tut es gut, dem Gedanken noch zwei Sätze Raum zu geben.")
-    if lacks_time:
-        p2_parts.append("Ein kleines Zeitfenster heute kann den Knoten lockern.")
-    p2 = (" ".join(p2_parts) or "Ein leiser Perspektivwechsel kann tragen.") + hint_m + hint_c
+    if tight and lacks_time:
+        p2 = f"{_FB_P2_TIGHT} {_FB_P2_TIME}"
+    else:
+        p2 = _FB_P2_TIGHT if tight else _FB_P2_TIME if lacks_time else _FB_P2_DEFAULT
+    p2 += hint_m + hint_c
 
-    impulse = "UNDO-Impuls: Kurz anhalten, atmen, einen machbaren Schritt wählen."
-    return f"{p1}\n\n{p2}\n\n{impulse}"
+    return f"{_FB_P1}\n\n{p2}\n\n{_FB_IMPULSE}"
 
 
 # ------------------------------------------------------------
 # KI-Feedback — Solo/WeDo
 # ------------------------------------------------------------
+_TONES = {
+    "morning": "Klinge leicht und zugewandt – hilf beim ruhigen Start in den Tag. Halte den Fokus klein und machbar.",
+    "evening": "Klinge entlastend und freundlich – würdige den Tag und zeige leise, was jetzt gut abschließen darf.",
+    None: "Klinge ruhig, klar und zugewandt.",
+}
+_POVS = {
+    "solo": "Du-Form, sprich die Person direkt an.",
+    "wedo": "Ihr-Form, sprecht die Gruppe als Team an.",
+}
+
+# Einzel-Calls: je (Zielgruppe, Modus) ein fertiger Systemprompt – Perspektive und Ton
+# werden dem Modell direkt vorgegeben statt aus einer Tabelle gewählt.
+_SYSTEM_PROMPTS = {}
+for _aud, _pov in _POVS.items():
+    for _mode, _tone in _TONES.items():
+        _SYSTEM_PROMPTS[(_aud, _mode)] = (
+            "Schreibe wie ein einfühlsamer, klarer Mensch im UNDO-Stil. "
+            "Sehr kurz: insgesamt höchstens ~110 Wörter. "
+            "Keine Bulletpoints, keine Zahlenlisten, keine Emojis, kein Jargon. "
+            f"{_pov} {_tone} "
+            "Gib exakt ZWEI kurze Absätze: "
+            "1) kurz spiegeln, was wesentlich ist; "
+            "2) eine kleine, machbare Perspektive, die nicht belehrt. "
+            "Schließe mit einer Zeile ab, die mit '{label}:' beginnt."
+        )
+del _aud, _pov, _mode, _tone
+
+# Batches: ein einziger, byte-identischer Systemprompt für alle Varianten; Zielgruppe/
+# Modus/Label stehen in der User-Nachricht. Nur hier wird der Prompt lang genug für
+# OpenAIs automatisches Prefix-Caching (ab 1024 Tokens).
+_SYS_FEEDBACK_BATCH: Final[str] = (
+    "Schreibe wie ein einfühlsamer, klarer Mensch im UNDO-Stil. "
+    "Sehr kurz: insgesamt höchstens ~110 Wörter. "
+    "Keine Bulletpoints, keine Zahlenlisten, keine Emojis, kein Jargon. "
+    "Perspektive nach 'Zielgruppe': "
+    + " ".join(f"{aud} → {pov}" for aud, pov in _POVS.items())
+    + " Ton nach 'Modus': "
+    + " ".join(f"{mode or 'sonst'} → {tone}" for mode, tone in _TONES.items())
+    + " Gib exakt ZWEI kurze Absätze: "
+    "1) kurz spiegeln, was wesentlich ist; "
+    "2) eine kleine, machbare Perspektive, die nicht belehrt. "
+    "Schließe mit einer Zeile ab, die mit dem angegebenen Label und ':' beginnt."
+)
+
+
+def _feedback_messages(
+    question_text: str,
+    answer_text: str,
+    motive: str,
+    chance: str,
+    mode: str | None,
+    audience: str,
+    impulse_label: str,
+) -> list:
+    aud = "solo" if (audience or "solo") == "solo" else "wedo"
+    label = impulse_label or ("WeDo-Impuls" if aud == "wedo" else "UNDO-Impuls")
+    system = _SYSTEM_PROMPTS[(aud, mode if mode in _TONES else None)].format(label=label)
+
+    # Hier normalisiert → sync/async/stream bauen identische Messages (gleicher Cache-Schlüssel)
+    user_msg = (
+        f"Modus: {mode or 'unbekannt'}\n"
+        f"Frage: {_norm(question_text)}\n"
+        f"Antwort: {_norm(answer_text)}\n"
+        f"Motiv (Warum): {_norm(motive) or '-'}\n"
+        f"Chance (Ziel): {_norm(chance) or '-'}\n\n"
+        f"Nutze als letztes genau das Label '{label}:' und hänge eine einzige Ein-Satz-Einladung an."
+    )
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user_msg},
+    ]
+
+
+_LIST_PREFIX_RE = re.compile(r"\n(?:[-•][ \t]|[1-9]\.)")
+
+
+def _strip_list_prefixes(text: str) -> str:
+    return _LIST_PREFIX_RE.sub("\n", text.strip())
+
+
+def _strip_lists(resp) -> str:
+    """Antworttext ohne Listenreste."""
+    return _strip_list_prefixes(resp.choices[0].message.content or "")
+
+
+def _feedback_ok(text: str) -> bool:
+    return not (_wc(text, cap=8) < 8 or "Feedback:" in text)
+
+
+def _feedback_postprocess(resp) -> str:
+    text = _strip_lists(resp)
+    if not _feedback_ok(text):
+        raise ValueError("Feedback unbrauchbar")
+    return text
+
+
+def _feedback_ai(
+    question_text: str,
+    answer_text: str,
+    motive: str,
+    chance: str,
+    mode: str | None,
+    audience: str,
+    impulse_label: str,
+    user_key: str | None,
+) -> str:
+    """KI-Feedback mit beiden Cache-Stufen; wirft bei Fehler/unbrauchbarer Antwort (→ nicht gecacht)."""
+    semantic = None
+    if user_key:
+        ctx = ("feedback", user_key, _norm(question_text), _norm(motive), _norm(chance),
+               mode, audience, impulse_label)
+        semantic = (ctx, _norm(answer_text))
+    client = _ensure_openai_client()
+    messages = _feedback_messages(question_text, answer_text, motive, chance, mode, audience, impulse_label)
+    return _chat(client, _REQ_FEEDBACK, messages, _feedback_postprocess, semantic=semantic)
+
+
 def ai_generate_feedback(
     question_text: str,
     answer_text: str,
@@ -274,6 +789,7 @@ def ai_generate_feedback(
     mode: str | None = None,         # "morning" | "evening" | None
     audience: str = "solo",           # "solo" | "wedo"
     impulse_label: str = "UNDO-Impuls",
+    user_key: str | None = None,      # z. B. str(user.id) – semantischer Cache je Nutzer (falls aktiviert)
 ) -> str:
     """
     Kurzes UNDO-Feedback: 2 kurze Absätze + Schlusszeile (Impuls).
@@ -281,68 +797,158 @@ def ai_generate_feedback(
     Solo: Du-Form. WeDo: Ihr-Form. Motiv/Chance fließen implizit ein.
     """
 
-    def _tone_for_mode(m: str | None) -> str:
-        if m == "morning":
-            return "Klinge leicht und zugewandt – hilf beim ruhigen Start in den Tag. Halte den Fokus klein und machbar."
-        if m == "evening":
-            return "Klinge entlastend und freundlich – würdige den Tag und zeige leise, was jetzt gut abschließen darf."
-        return "Klinge ruhig, klar und zugewandt."
+    if not _ai_available():
+        return _fallback_feedback(question_text, answer_text, motive, chance)
 
-    def _soft_fallback() -> str:
+    try:
+        return _feedback_ai(
+            question_text, answer_text, motive, chance, mode, audience, impulse_label, user_key,
+        )
+    except Exception:
         return _fallback_feedback(question_text, answer_text, motive, chance)
 
+
+async def ai_generate_feedback_async(
+    question_text: str,
+    answer_text: str,
+    motive: str,
+    chance: str,
+    mode: str | None = None,
+    audience: str = "solo",
+    impulse_label: str = "UNDO-Impuls",
+    user_key: str | None = None,
+) -> str:
+    """
+    Wie ai_generate_feedback, aber nicht-blockierend (für asyncio.gather mit weiteren ai_*_async).
+    user_key nur für gleiche Signatur – der semantische Cache läuft allein im Sync-Pfad.
+    """
+    if not _ai_available():
+        return _fallback_feedback(question_text, answer_text, motive, chance)
     try:
-        client = _ensure_openai_client()
+        async with _async_openai_client() as client:
+            return await _chat_async(
+                client, _REQ_FEEDBACK,
+                _feedback_messages(question_text, answer_text, motive, chance, mode, audience, impulse_label),
+                _feedback_postprocess,
+            )
+    except Exception:
+        return _fallback_feedback(question_text, answer_text, motive, chance)
 
-        pov = ("Du-Form, sprich die Person direkt an."
-               if (audience or "solo") == "solo"
-               else "Ihr-Form, sprecht die Gruppe als Team an.")
-        label = impulse_label or ("WeDo-Impuls" if (audience or "solo") == "wedo" else "UNDO-Impuls")
 
-        system = (
-            "Schreibe wie ein einfühlsamer, klarer Mensch im UNDO-Stil. "
-            "Sehr kurz: insgesamt höchstens ~110 Wörter. "
-            "Keine Bulletpoints, keine Zahlenlisten, keine Emojis, kein Jargon. "
-            f"{pov} "
-            f"{_tone_for_mode(mode)} "
-            "Gib exakt ZWEI kurze Absätze: "
-            "1) kurz spiegeln, was wesentlich ist; "
-            "2) eine kleine, machbare Perspektive, die nicht belehrt. "
-            f"Schließe mit einer Zeile ab, die mit '{label}:' beginnt."
-        )
+def _stream_cache_put(key: Optional[str], parts: List[str]) -> None:
+    """Vollständig gestreamten Text wie bei _chat nachbearbeitet cachen (nur wenn brauchbar)."""
+    text = _strip_list_prefixes("".join(parts))
+    if _feedback_ok(text):
+        _llm_cache.put(key, text)
 
-        user_msg = (
-            f"Modus: {mode or 'unbekannt'}\n"
-            f"Frage: {question_text}\n"
-            f"Antwort: {answer_text}\n"
-            f"Motiv (Warum): {motive or '-'}\n"
-            f"Chance (Ziel): {chance or '-'}\n\n"
-            f"Nutze als letztes genau das Label '{label}:' und hänge eine einzige Ein-Satz-Einladung an."
+
+def ai_generate_feedback_stream(
+    question_text: str,
+    answer_text: str,
+    motive: str,
+    chance: str,
+    mode: str | None = None,
+    audience: str = "solo",
+    impulse_label: str = "UNDO-Impuls",
+    user_key: str | None = None,
+) -> Iterator[str]:
+    """
+    Wie ai_generate_feedback, aber gestreamt: liefert Textstücke, sobald sie ankommen.
+    user_key nur für gleiche Signatur (kein semantischer Cache beim Streamen).
+    Bei Fehlern vor dem ersten Stück kommt der Fallback als einziges Stück.
+    Endtext (Listen entfernt, ggf. Fallback) → collect_feedback_stream().
+    """
+    if not _ai_available():
+        yield _fallback_feedback(question_text, answer_text, motive, chance)
+        return
+
+    # Gleicher Schlüssel wie ai_generate_feedback → Treffer kommen sofort als ein Stück
+    messages = _feedback_messages(question_text, answer_text, motive, chance, mode, audience, impulse_label)
+    key = _llm_cache.key_for(_REQ_FEEDBACK, messages)
+    cached = _llm_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    got_any = False
+    parts: List[str] = []
+    try:
+        client = _ensure_openai_client()
+        stream = client.chat.completions.create(
+            **_REQ_FEEDBACK,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
         )
+        for chunk in stream:
+            # Letzter Chunk trägt nur "usage" (ohne choices)
+            if chunk.choices and chunk.choices[0].delta.content:
+                got_any = True
+                parts.append(chunk.choices[0].delta.content)
+                yield parts[-1]
+        _stream_cache_put(key, parts)
+    except Exception:
+        logger.exception("ai_generate_feedback_stream failed")
+        if not got_any:
+            yield _fallback_feedback(question_text, answer_text, motive, chance)
+
 
-        def _do():
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user_msg},
-                ],
-                temperature=0.5,
-                max_tokens=260,
+async def ai_generate_feedback_stream_async(
+    question_text: str,
+    answer_text: str,
+    motive: str,
+    chance: str,
+    mode: str | None = None,
+    audience: str = "solo",
+    impulse_label: str = "UNDO-Impuls",
+    user_key: str | None = None,
+) -> AsyncIterator[str]:
+    """Async-Variante von ai_generate_feedback_stream (AsyncOpenAI, `async for`)."""
+    if not _ai_available():
+        yield _fallback_feedback(question_text, answer_text, motive, chance)
+        return
+
+    messages = _feedback_messages(question_text, answer_text, motive, chance, mode, audience, impulse_label)
+    key = _llm_cache.key_for(_REQ_FEEDBACK, messages)
+    cached = _llm_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    got_any = False
+    parts: List[str] = []
+    try:
+        async with _async_openai_client() as client:
+            stream = await client.chat.completions.create(
+                **_REQ_FEEDBACK,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
             )
-            text = (resp.choices[0].message.content or "").strip()
-            # Listenreste entfernen
-            for pat in ("\n- ", "\n• ", "\n1.", "\n2.", "\n3."):
-                text = text.replace(pat, "\n")
-            return text
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    got_any = True
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+        _stream_cache_put(key, parts)
+    except Exception:
+        logger.exception("ai_generate_feedback_stream_async failed")
+        if not got_any:
+            yield _fallback_feedback(question_text, answer_text, motive, chance)
 
-        text = _call_openai_safe(_do, fallback_text=_soft_fallback())
-        if len(text.split()) < 8 or "Feedback:" in text:
-            return _soft_fallback()
-        return text
 
-    except Exception:
-        return _soft_fallback()
+def collect_feedback_stream(
+    chunks: Iterable[str],
+    question_text: str,
+    answer_text: str,
+    motive: str,
+    chance: str,
+) -> str:
+    """Setzt gestreamte Stücke zum Endtext zusammen – mit derselben Nachbearbeitung wie ai_generate_feedback."""
+    text = _strip_list_prefixes("".join(chunks))
+    if not _feedback_ok(text):
+        return _fallback_feedback(question_text, answer_text, motive, chance)
+    return text
 
 
 def ai_generate_group_feedback(
@@ -351,103 +957,396 @@ def ai_generate_group_feedback(
     motive: str,
     chance: str,
     mode: str | None = None,
+    user_key: str | None = None,
 ) -> str:
     """Spezielle WeDo-Variante — Ihr-Form + Label 'WeDo-Impuls'."""
     return ai_generate_feedback(
         question_text, answer_text, motive, chance,
-        mode=mode, audience="wedo", impulse_label="WeDo-Impuls"
+        mode=mode, audience="wedo", impulse_label="WeDo-Impuls", user_key=user_key
+    )
+
+
+async def ai_generate_group_feedback_async(
+    question_text: str,
+    answer_text: str,
+    motive: str,
+    chance: str,
+    mode: str | None = None,
+    user_key: str | None = None,
+) -> str:
+    """Async-Variante von ai_generate_group_feedback."""
+    return await ai_generate_feedback_async(
+        question_text, answer_text, motive, chance,
+        mode=mode, audience="wedo", impulse_label="WeDo-Impuls", user_key=user_key
+    )
+
+
+async def ai_generate_feedback_many(items: List[dict]) -> List[str]:
+    """
+    Viele Feedbacks parallel (AsyncOpenAI), höchstens _AI_CONCURRENCY gleichzeitig.
+    items: Dicts mit den Argumenten von ai_generate_feedback
+    (question_text, answer_text, motive, chance, optional mode/audience/impulse_label/user_key).
+    Reihenfolge bleibt erhalten; Fehler (auch ein kaputter Eintrag) → Fallback nur für diesen Eintrag.
+    """
+    sem = asyncio.Semaphore(_AI_CONCURRENCY)
+
+    async def _one(it: dict) -> str:
+        async with sem:
+            return await ai_generate_feedback_async(**it)
+
+    async with _async_client_scope():
+        results = await asyncio.gather(*(_one(it) for it in items), return_exceptions=True)
+    return [
+        _fallback_feedback(it.get("question_text", ""), it.get("answer_text", ""),
+                           it.get("motive", ""), it.get("chance", ""))
+        if isinstance(res, BaseException) else res
+        for it, res in zip(items, results)
+    ]
+
+
+_BATCH_CHUNK = 10  # 10 × 180 = 1800 max_tokens pro Request
+_BATCH_TAG_RE = re.compile(r"^\s*\[#\d+\]\s*")  # falls das Modell den Tag doch mitschreibt
+
+
+def _feedback_batch_messages(items: List[dict], mode: str | None, aud: str, label: str) -> list:
+    system = (
+        _SYS_FEEDBACK_BATCH
+        + f' Antworte als JSON-Objekt {{"feedback": [...]}} mit genau {len(items)} Texten: '
+        "Element n gehört zum Eintrag [#n]; Tags nicht wiederholen."
+    )
+    blocks = [
+        f"[#{i}] Frage: {it['question_text']}\n"
+        f"Antwort: {it['answer_text']}\n"
+        f"Motiv (Warum): {it['motive'] or '-'} | Chance (Ziel): {it['chance'] or '-'}"
+        for i, it in enumerate(items, 1)
+    ]
+    user_msg = (
+        f"Zielgruppe: {aud} | Modus: {mode if mode in _TONES else 'sonst'} | Label: {label}\n"
+        "Für jeden der folgenden Einträge erzeuge ein eigenes Feedback:\n\n"
+        + "\n\n".join(blocks)
+    )
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user_msg},
+    ]
+
+
+def _feedback_batch_call(items: List[dict], mode: str | None, aud: str, label: str) -> List[Optional[str]]:
+    """Ein Request für bis zu _BATCH_CHUNK Einträge; unbrauchbare Einzeltexte → None."""
+    client = _ensure_openai_client()
+    resp = client.chat.completions.create(
+        model=_REQ_FEEDBACK["model"],
+        temperature=_REQ_FEEDBACK["temperature"],
+        max_tokens=min(_REQ_FEEDBACK["max_tokens"] * len(items), 1800),
+        timeout=_OPENAI_TIMEOUT_BATCH,
+        response_format=_JSON_OBJECT,
+        messages=_feedback_batch_messages(items, mode, aud, label),
     )
+    texts = json.loads(resp.choices[0].message.content or "")["feedback"]
+    if not isinstance(texts, list) or len(texts) != len(items):
+        raise ValueError("Batch-Feedback unvollständig")
+    out: List[Optional[str]] = []
+    for t in texts:
+        t = _strip_list_prefixes(_BATCH_TAG_RE.sub("", t, count=1)) if isinstance(t, str) else ""
+        out.append(t if _feedback_ok(t) else None)
+    return out
+
+
+def ai_generate_feedback_batch(
+    items: List[dict],
+    audience: str = "wedo",
+    mode: str | None = None,
+    impulse_label: str = "",
+) -> List[str]:
+    """
+    Feedback für viele Einträge (z. B. alle Mitglieder einer WeDo-Gruppe) mit
+    einem Request je 10 Einträge statt K Einzel-Calls.
+    items: Dicts mit question_text, answer_text, motive, chance (optional user_key).
+    Semantische Cache-Treffer (nur Einträge mit user_key) werden nicht erneut geschickt;
+    Ausfälle → Fallback je Eintrag.
+    """
+    def _fb(it: dict) -> str:
+        return _fallback_feedback(it.get("question_text", ""), it.get("answer_text", ""),
+                                  it.get("motive", ""), it.get("chance", ""))
+
+    if not _ai_available():
+        return [_fb(it) for it in items]
+
+    aud = "solo" if (audience or "solo") == "solo" else "wedo"
+    label = impulse_label or ("WeDo-Impuls" if aud == "wedo" else "UNDO-Impuls")
+    results: List[Optional[str]] = [None] * len(items)
+    norms = [{k: _norm(it.get(k, "")) for k in ("question_text", "answer_text", "motive", "chance")}
+             for it in items]
+    keyed = [i for i, it in enumerate(items) if it.get("user_key")] if _semantic_cache.ENABLED else []
+    # Alle Embeddings in einem Request statt einem je Eintrag
+    vecs: dict = dict(zip(keyed, _embed_many([norms[i]["answer_text"] for i in keyed])))
+    pending: List[Tuple[int, dict, Optional[tuple], object]] = []
+    for i, norm in enumerate(norms):
+        ctx = vec = None
+        if i in vecs:
+            ctx = ("feedback", str(items[i]["user_key"]), norm["question_text"], norm["motive"], norm["chance"],
+                   mode, aud, label)
+            vec = vecs[i]
+            results[i] = _semantic_cache.lookup(ctx, vec)
+        if results[i] is None:
+            pending.append((i, norm, ctx, vec))
+
+    for start in range(0, len(pending), _BATCH_CHUNK):
+        chunk = pending[start:start + _BATCH_CHUNK]
+        try:
+            texts = _feedback_batch_call([norm for _, norm, _, _ in chunk], mode, aud, label)
+        except Exception:
+            logger.exception("ai_generate_feedback_batch: Chunk fehlgeschlagen")
+            continue
+        for (i, _, ctx, vec), text in zip(chunk, texts):
+            if text is not None:
+                if ctx is not None:
+                    _semantic_cache.store(ctx, vec, text)
+                results[i] = text
+
+    return [r if r is not None else _fb(it) for r, it in zip(results, items)]
 
 
 # ------------------------------------------------------------
 # Reports & Vergleiche
 # ------------------------------------------------------------
+_WEEKLY_FALLBACK = "Ein ruhiger Wochenblick: Was trug, darf leiser wachsen. UNDO-Impuls: Am Sonntag kurz ordnen, dann leicht starten."
+
+
+_SYS_WEEKLY: Final[str] = (
+    "Schreibe wie ein einfühlsamer, klarer Mensch im UNDO-Stil. "
+    "1–2 kurze Absätze, maximal ~140 Wörter, keine Listen. "
+    "Kurzes Spiegeln der Woche, ein ruhiger Fokus, sanfter Ausblick. "
+    "Schlusszeile 'UNDO-Impuls: ...'."
+)
+
+
+def _weekly_messages(snippets: List[str], motive: str, chance: str) -> list:
+    # normalisiert für alle Aufrufer (sync, async, Batch-API) → gleicher Cache-Schlüssel
+    content = "\n\n".join(f"- {_norm(s)}" for s in snippets[:12])
+    user = f"Beweggrund: {_norm(motive) or '-'} | Aussicht: {_norm(chance) or '-'}\nBeispiele der Woche:\n{content}"
+    return [{"role": "system", "content": _SYS_WEEKLY},
+            {"role": "user", "content": user}]
+
+
+def _weekly_postprocess(resp) -> str:
+    text = _strip_lists(resp)
+    if _wc(text, cap=8) < 8:
+        raise ValueError("Wochenreport unbrauchbar")
+    return text
+
+
 def ai_weekly_report(snippets: List[str], motive: str, chance: str) -> str:
     """Kompakter Wochenrückblick: 1–2 Absätze + Impuls (UNDO-Stil)."""
+    if not _ai_available():
+        return _WEEKLY_FALLBACK
     try:
         client = _ensure_openai_client()
-        content = "\n\n".join(f"- {s}" for s in snippets[:12])
-        system = (
-            "Schreibe wie ein einfühlsamer, klarer Mensch im UNDO-Stil. "
-            "1–2 kurze Absätze, maximal ~140 Wörter, keine Listen. "
-            "Kurzes Spiegeln der Woche, ein ruhiger Fokus, sanfter Ausblick. "
-            "Schlusszeile 'UNDO-Impuls: ...'."
-        )
-        user = f"Beweggrund: {motive or '-'} | Aussicht: {chance or '-'}\nBeispiele der Woche:\n{content}"
-
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": system},
-                      {"role": "user", "content": user}],
-            temperature=0.5,
-            max_tokens=260,
-        )
-        text = (resp.choices[0].message.content or "").strip()
-        for pat in ("\n- ", "\n• ", "\n1.", "\n2.", "\n3."):
-            text = text.replace(pat, "\n")
-        return text if len(text.split()) >= 8 else "Ein ruhiger Wochenblick: Was trug, darf leiser wachsen. UNDO-Impuls: Am Sonntag kurz ordnen, dann leicht starten."
+        return _chat(client, _REQ_WEEKLY, _weekly_messages(snippets, motive, chance), _weekly_postprocess)
     except Exception:
-        return "Ein ruhiger Wochenblick: Was trug, darf leiser wachsen. UNDO-Impuls: Am Sonntag kurz ordnen, dann leicht starten."
+        return _WEEKLY_FALLBACK
+
+
+async def ai_weekly_report_async(snippets: List[str], motive: str, chance: str) -> str:
+    """Wie ai_weekly_report, aber nicht-blockierend (AsyncOpenAI) – für viele Nutzer parallel."""
+    if not _ai_available():
+        return _WEEKLY_FALLBACK
+    try:
+        async with _async_openai_client() as client:
+            return await _chat_async(client, _REQ_WEEKLY, _weekly_messages(snippets, motive, chance),
+                                     _weekly_postprocess)
+    except Exception:
+        return _WEEKLY_FALLBACK
+
+
+async def batch_weekly_reports(users: List[Tuple[int, List[str], str, str]]) -> dict[int, str]:
+    """
+    Wochenreports für viele Nutzer gleichzeitig (z. B. Cron).
+    users: [(user_id, snippets, motive, chance), ...] → {user_id: report}
+    """
+    sem = asyncio.Semaphore(_AI_CONCURRENCY)
+
+    async def _one(snippets, motive, chance):
+        async with sem:
+            return await ai_weekly_report_async(snippets, motive, chance)
+
+    async with _async_client_scope():
+        results = await asyncio.gather(
+            *(_one(snippets, motive, chance) for _, snippets, motive, chance in users),
+            return_exceptions=True,
+        )
+    return {
+        uid: (_WEEKLY_FALLBACK if isinstance(res, BaseException) else res)
+        for (uid, *_), res in zip(users, results)
+    }
+
+
+# Batch-API (Cron über Nacht): halber Preis, eigenes Rate-Limit, Ergebnis binnen 24 h.
+_BATCH_ENDPOINT = "/v1/chat/completions"
+_BATCH_TERMINAL_FAIL = frozenset({"failed", "expired", "cancelled"})
+
+
+def submit_weekly_reports_batch(users: List[Tuple[int, List[str], str, str]]) -> str:
+    """
+    Wochenreports als OpenAI-Batch einreichen (nicht für On-Demand-Pro-Anfragen).
+    users: [(user_id, snippets, motive, chance), ...] → Batch-ID (für collect_weekly_reports_batch).
+    """
+    client = _ensure_openai_client()
+    lines = [
+        json.dumps({
+            "custom_id": str(uid),
+            "method": "POST",
+            "url": _BATCH_ENDPOINT,
+            "body": {**_REQ_WEEKLY, "messages": _weekly_messages(snippets, motive, chance)},
+        }, ensure_ascii=False)
+        for uid, snippets, motive, chance in users
+    ]
+    upload = client.files.create(
+        file=("weekly_reports.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=upload.id,
+        endpoint=_BATCH_ENDPOINT,
+        completion_window="24h",
+        metadata={"kind": "weekly_report"},
+    )
+    return batch.id
+
+
+def collect_weekly_reports_batch(batch_id: str) -> Optional[dict[int, str]]:
+    """
+    Ergebnis eines Wochenreport-Batches abholen.
+    None → noch in Arbeit (später erneut pollen); {} → Batch gescheitert/abgelaufen.
+    Unbrauchbare Einzelantworten → _WEEKLY_FALLBACK.
+    """
+    client = _ensure_openai_client()
+    batch = client.batches.retrieve(batch_id)
+    if batch.status in _BATCH_TERMINAL_FAIL:
+        logger.warning("Wochenreport-Batch %s: %s", batch_id, batch.status)
+        return {}
+    if batch.status != "completed" or not batch.output_file_id:
+        return None
+
+    reports: dict[int, str] = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        text = ""
+        try:
+            text = _strip_list_prefixes(row["response"]["body"]["choices"][0]["message"]["content"] or "")
+        except (KeyError, IndexError, TypeError):
+            pass
+        reports[int(row["custom_id"])] = text if _wc(text, cap=8) >= 8 else _WEEKLY_FALLBACK
+    return reports
+
+
+_MONTHLY_FALLBACK = "Ein stiller Monatsblick: Deine Linie wird klarer. UNDO-Impuls: Nimm dir eine Sache, die leicht bleibt – und zieh sie leise durch."
+
+
+_SYS_MONTHLY: Final[str] = (
+    "Schreibe wie ein einfühlsamer, klarer Mensch im UNDO-Stil. "
+    "2 Absätze, maximal ~180 Wörter, keine Listen. "
+    "Würdige die Entwicklung, mache zwei stille Stärken sichtbar und zeige behutsam eine Richtung. "
+    "Schlusszeile 'UNDO-Impuls: ...'."
+)
+
+
+def _monthly_messages(snippets: List[str], motive: str, chance: str) -> list:
+    content = "\n\n".join(f"- {_norm(s)}" for s in snippets[:20])
+    user = f"Beweggrund: {_norm(motive) or '-'} | Aussicht: {_norm(chance) or '-'}\nMonatsbeispiele:\n{content}"
+    return [{"role": "system", "content": _SYS_MONTHLY},
+            {"role": "user", "content": user}]
+
+
+def _monthly_postprocess(resp) -> str:
+    text = _strip_lists(resp)
+    if _wc(text, cap=8) < 8:
+        raise ValueError("Monatsreport unbrauchbar")
+    return text
 
 
 def ai_monthly_report(snippets: List[str], motive: str, chance: str) -> str:
     """Kompakter Monatsrückblick: 2 Absätze + Impuls (UNDO-Stil)."""
+    if not _ai_available():
+        return _MONTHLY_FALLBACK
     try:
         client = _ensure_openai_client()
-        content = "\n\n".join(f"- {s}" for s in snippets[:20])
-        system = (
-            "Schreibe wie ein einfühlsamer, klarer Mensch im UNDO-Stil. "
-            "2 Absätze, maximal ~180 Wörter, keine Listen. "
-            "Würdige die Entwicklung, mache zwei stille Stärken sichtbar und zeige behutsam eine Richtung. "
-            "Schlusszeile 'UNDO-Impuls: ...'."
-        )
-        user = f"Beweggrund: {motive or '-'} | Aussicht: {chance or '-'}\nMonatsbeispiele:\n{content}"
-
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": system},
-                      {"role": "user", "content": user}],
-            temperature=0.5,
-            max_tokens=320,
-        )
-        text = (resp.choices[0].message.content or "").strip()
-        for pat in ("\n- ", "\n• ", "\n1.", "\n2.", "\n3."):
-            text = text.replace(pat, "\n")
-        return text if len(text.split()) >= 8 else "Ein stiller Monatsblick: Deine Linie wird klarer. UNDO-Impuls: Nimm dir eine Sache, die leicht bleibt – und zieh sie leise durch."
+        return _chat(client, _REQ_MONTHLY, _monthly_messages(snippets, motive, chance), _monthly_postprocess)
     except Exception:
-        return "Ein stiller Monatsblick: Deine Linie wird klarer. UNDO-Impuls: Nimm dir eine Sache, die leicht bleibt – und zieh sie leise durch."
+        return _MONTHLY_FALLBACK
+
+
+async def ai_monthly_report_async(snippets: List[str], motive: str, chance: str) -> str:
+    """Async-Variante von ai_monthly_report."""
+    if not _ai_available():
+        return _MONTHLY_FALLBACK
+    try:
+        async with _async_openai_client() as client:
+            return await _chat_async(client, _REQ_MONTHLY, _monthly_messages(snippets, motive, chance),
+                                     _monthly_postprocess)
+    except Exception:
+        return _MONTHLY_FALLBACK
+
+
+_COMPARE_FALLBACK = "Du bist klarer geworden – und das trägt. UNDO-Impuls: Bleib klein, aber täglich sichtbar."
+
+
+_SYS_COMPARE: Final[str] = (
+    "Schreibe wie ein einfühlsamer, klarer Mensch im UNDO-Stil. "
+    "Zwei Sätze, keine Liste. "
+    "Erstes: kurz spiegeln, was neu/gewachsen ist. "
+    "Zweites: sanft die Richtung halten. "
+    "Schlusszeile 'UNDO-Impuls: ...' (eine Zeile)."
+)
+
+
+def _compare_messages(question_text: str, previous_answer: str, current_answer: str) -> list:
+    user = (
+        f"Frage: {_norm(question_text)}\n"
+        f"Vorherige Antwort: {_norm(previous_answer)}\n"
+        f"Aktuelle Antwort: {_norm(current_answer)}\n"
+    )
+    return [{"role": "system", "content": _SYS_COMPARE},
+            {"role": "user", "content": user}]
+
+
+def _compare_postprocess(resp) -> str:
+    text = _strip_lists(resp)
+    if _wc(text, cap=6) < 6:
+        raise ValueError("Vergleich unbrauchbar")
+    return text
 
 
-def ai_answer_compare(question_text: str, previous_answer: str, current_answer: str) -> str:
-    """Vergleich zweier Antworten – 2 Sätze + Impuls (UNDO-Stil)."""
+def ai_answer_compare(
+    question_text: str, previous_answer: str, current_answer: str, user_key: str | None = None
+) -> str:
+    """Vergleich zweier Antworten – 2 Sätze + Impuls (UNDO-Stil). user_key wie bei ai_generate_feedback."""
+    if not _ai_available():
+        return _COMPARE_FALLBACK
     try:
+        semantic = None
+        if user_key:
+            semantic = (("compare", user_key, _norm(question_text), _norm(previous_answer)), _norm(current_answer))
         client = _ensure_openai_client()
-        system = (
-            "Schreibe wie ein einfühlsamer, klarer Mensch im UNDO-Stil. "
-            "Zwei Sätze, keine Liste. "
-            "Erstes: kurz spiegeln, was neu/gewachsen ist. "
-            "Zweites: sanft die Richtung halten. "
-            "Schlusszeile 'UNDO-Impuls: ...' (eine Zeile)."
-        )
-        user = (
-            f"Frage: {question_text}\n"
-            f"Vorherige Antwort: {previous_answer}\n"
-            f"Aktuelle Antwort: {current_answer}\n"
-        )
+        return _chat(client, _REQ_COMPARE, _compare_messages(question_text, previous_answer, current_answer),
+                     _compare_postprocess, semantic=semantic)
+    except Exception:
+        return _COMPARE_FALLBACK
 
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": system},
-                      {"role": "user", "content": user}],
-            temperature=0.55,
-            max_tokens=180,
-        )
-        text = (resp.choices[0].message.content or "").strip()
-        for pat in ("\n- ", "\n• ", "\n1.", "\n2.", "\n3."):
-            text = text.replace(pat, "\n")
-        return text if len(text.split()) >= 6 else "Du bist klarer geworden – und das trägt. UNDO-Impuls: Bleib klein, aber täglich sichtbar."
+
+async def ai_answer_compare_async(question_text: str, previous_answer: str, current_answer: str) -> str:
+    """Async-Variante von ai_answer_compare."""
+    if not _ai_available():
+        return _COMPARE_FALLBACK
+    try:
+        async with _async_openai_client() as client:
+            return await _chat_async(client, _REQ_COMPARE,
+                                     _compare_messages(question_text, previous_answer, current_answer),
+                                     _compare_postprocess)
     except Exception:
-        return "Du bist klarer geworden – und das trägt. UNDO-Impuls: Bleib klein, aber täglich sichtbar."
+        return _COMPARE_FALLBACK
 
 
 # ------------------------------------------------------------
@@ -457,82 +1356,171 @@ def ai_answer_compare(question_text: str, previous_answer: str, current_answer:
 # Seeds nur als Notfall – standardmäßig KI-only
 USE_SEED_FALLBACK = False
 
-def ai_generate_group_question(*, motive: str | None, chance: str | None, mode: str = "morning") -> str:
+_GROUP_Q_FALLBACK = "Womit wollt ihr heute beginnen, damit es sich leicht und stimmig anfühlt?"
+
+
+_SYS_GROUP_QUESTION: Final[str] = (
+    "Du bist UNDO · WeDo. Formuliere genau EINE kurze Gruppenfrage (8–18 Wörter), "
+    "in zweiter Person Plural (ihr/euch/euer), warm, klar und alltagstauglich. "
+    "Binde Motiv/Chance nur implizit ein (keine wörtliche Nennung). "
+    "Kein Vorwort, keine Liste, keine Emojis. "
+    'Antworte ausschließlich als JSON: {"question": "<frage>"}'
+)
+
+
+def _group_question_messages(motive_s: str, chance_s: str, mode: str) -> list:
+    tone = "kleiner, ruhiger Start" if mode == "morning" else "leiser Abschlussblick"
+    user = (
+        f"Modus: {mode} ({tone})\n"
+        f"Motiv (Warum): {motive_s or '—'}\n"
+        f"Chance (Ziel): {chance_s or '—'}\n"
+        "Gib genau einen Satz zurück, der mit '?' endet."
+    )
+    return [
+        {"role": "system", "content": _SYS_GROUP_QUESTION},
+        {"role": "user", "content": user},
+    ]
+
+
+def _parse_question(resp) -> str:
+    """JSON-Antwort {"question": ...} lesen; Formverstoß → ValueError (→ Fallback)."""
+    q = json.loads(resp.choices[0].message.content or "")["question"]
+    if not isinstance(q, str) or not q.strip().endswith("?"):
+        raise ValueError("Frage ohne '?'")
+    return q.strip()
+
+
+_PRONOUN_FIX = {"wir": "ihr", "ich": "ihr", "uns": "euch", "unser": "euer"}
+_TOKEN_SPLIT_RE = re.compile(r"(\W+)")
+
+
+def _group_question_finalize(q: str) -> str:
+    """Wortanzahl prüfen und sanft auf Ihr-Form korrigieren – in einem Durchlauf."""
+    parts = _TOKEN_SPLIT_RE.split(q)  # gerade Indizes: Wörter, ungerade: Trenner
+    words = 0
+    for i in range(0, len(parts), 2):
+        tok = parts[i]
+        if not tok:
+            continue
+        words += 1
+        fix = _PRONOUN_FIX.get(tok.lower())
+        if fix:
+            parts[i] = fix.capitalize() if tok[0].isupper() else fix
+
+    # Minimal-Validierung: Wortanzahl
+    if words < 6 or words > 22:
+        return _GROUP_Q_FALLBACK
+    return "".join(parts)
+
+
+def _group_question_ai(motive_s: str, chance_s: str, mode: str) -> str:
+    """Rohfrage der KI (ungecacht); wirft bei Fehler/Formverstoß."""
+    client = _ensure_openai_client()
+    messages = _group_question_messages(motive_s, chance_s, mode)
+    return _parse_question(_create(client, _REQ_GROUP_QUESTION, messages))
+
+
+@lru_cache(maxsize=4096)
+def _group_question_cached(motive_s: str, chance_s: str, mode: str, day: str) -> str:
+    """
+    Rohfrage gecacht pro (Motiv, Chance, Modus, Tag).
+    `day` ist nur Cache-Schlüssel; Fehler werfen und werden daher nicht gecacht.
+    """
+    return _group_question_ai(motive_s, chance_s, mode)
+
+
+def ai_generate_group_question(
+    *, motive: str | None, chance: str | None, mode: str = "morning", fresh: bool = False
+) -> str:
     """
     Erstelle EINE kurze Gruppenfrage (8–18 Wörter).
     - Ihr-Form (ihr/euch/euer), warm, simpel, alltagstauglich.
     - Motiv/Chance implizit einfließen lassen (nicht wörtlich nennen).
     - Modus „morning/evening“ bestimmt Ton (Start/Abschluss).
     - Gib NUR die Frage zurück (eine Zeile, endet mit "?").
+    - Pro (Motiv, Chance, Modus) wird am selben Tag nur einmal generiert;
+      fresh=True (bezahlte Extra-Frage) fragt neu an und lässt den Tages-Cache aus.
     """
+    if not _ai_available():
+        return _GROUP_Q_FALLBACK
     motive_s = (motive or "").strip()
     chance_s = (chance or "").strip()
-    tone = "kleiner, ruhiger Start" if mode == "morning" else "leiser Abschlussblick"
 
     try:
-        client = _ensure_openai_client()
-
-        system = (
-            "Du bist UNDO · WeDo. Formuliere genau EINE kurze Gruppenfrage (8–18 Wörter), "
-            "in zweiter Person Plural (ihr/euch/euer), warm, klar und alltagstauglich. "
-            "Binde Motiv/Chance nur implizit ein (keine wörtliche Nennung). "
-            "Kein Vorwort, keine Liste, keine Emojis – gib NUR die Frage zurück."
-        )
-        user = (
-            f"Modus: {mode} ({tone})\n"
-            f"Motiv (Warum): {motive_s or '—'}\n"
-            f"Chance (Ziel): {chance_s or '—'}\n"
-            "Gib genau einen Satz zurück, der mit '?' endet."
-        )
-
-        def _do():
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                temperature=0.55,
-                max_tokens=60,
-                messages=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user},
-                ],
-            )
-            q = (resp.choices[0].message.content or "").strip()
-            q = q.splitlines()[0].strip()
-            if not q.endswith("?"):
-                q = q.rstrip(". ") + "?"
-
-            # Minimal-Validierung: Wortanzahl
-            wc = len(q.split())
-            if wc < 6 or wc > 22:
-                return "Womit wollt ihr heute beginnen, damit es sich leicht und stimmig anfühlt?"
-
-            # Sanfte Korrekturen auf Ihr-Form
-            low = q.lower()
-            if (" ich " in f" {low} ") or (" wir " in f" {low} "):
-                q = q.replace("Wir ", "Ihr ").replace(" wir ", " ihr ")
-                q = q.replace("Ich ", "Ihr ").replace(" ich ", " ihr ")
-                q = q.replace(" uns ", " euch ").replace(" unser ", " euer ")
-            return q
-
-        return _call_openai_safe(_do, fallback_text="Womit wollt ihr heute beginnen, damit es sich leicht und stimmig anfühlt?")
+        if fresh:
+            q = _group_question_ai(motive_s, chance_s, mode)
+        else:
+            q = _group_question_cached(motive_s, chance_s, mode, date.today().isoformat())
+        return _group_question_finalize(q)
 
     except Exception as e:
         try:
             logger.exception("ai_generate_group_question failed: %s", e)
         except Exception:
             pass
-        return "Womit wollt ihr heute beginnen, damit es sich leicht und stimmig anfühlt?"
+        return _GROUP_Q_FALLBACK
+
+
+async def ai_generate_group_question_async(*, motive: str | None, chance: str | None, mode: str = "morning") -> str:
+    """Async-Variante von ai_generate_group_question (ohne Tages-Cache)."""
+    if not _ai_available():
+        return _GROUP_Q_FALLBACK
+    try:
+        async with _async_openai_client() as client:
+            resp = await client.chat.completions.create(
+                **_REQ_GROUP_QUESTION,
+                messages=_group_question_messages((motive or "").strip(), (chance or "").strip(), mode),
+            )
+        return _group_question_finalize(_parse_question(resp))
+    except Exception as e:
+        logger.exception("ai_generate_group_question_async failed: %s", e)
+        return _GROUP_Q_FALLBACK
+
+
+_SYS_SOLO_QUESTION: Final[str] = (
+    "Formuliere genau EINE Frage im UNDO-Stil. Warm, konkret, natürlich. "
+    "Max. 22 Wörter. Kein Listenstil, kein Jargon, keine Emojis. "
+    'Antworte ausschließlich als JSON: {"question": "<frage>"}'
+)
+
+
+def _solo_question_messages(motive_s: str, chance_s: str, mode: str) -> list:
+    user_msg = (
+        f"Modus: {mode or 'unbekannt'}\n"
+        f"Motiv: {motive_s or '-'}\n"
+        f"Chance: {chance_s or '-'}\n"
+        "Kontext: Tägliche Selbstreflexion, die zu kleinen bewussten Veränderungen einlädt."
+    )
+    return [
+        {"role": "system", "content": _SYS_SOLO_QUESTION},
+        {"role": "user", "content": user_msg},
+    ]
+
 
+def _solo_question_postprocess(resp) -> str:
+    text = _parse_question(resp)
+    if len(text) > 180:
+        raise ValueError("Frage zu lang")
+    return text
 
-def ai_generate_question(motive: str, chance: str, mode: str, seed_texts: List[str] | None = None) -> str:
+
+def _solo_question_ai(motive_s: str, chance_s: str, mode: str) -> str:
+    """KI-Solo-Frage (ungecacht); wirft bei Fehler/Formverstoß."""
+    client = _ensure_openai_client()
+    messages = _solo_question_messages(motive_s, chance_s, mode)
+    return _solo_question_postprocess(_create(client, _REQ_SOLO_QUESTION, messages))
+
+
+@lru_cache(maxsize=4096)
+def _solo_question_cached(motive_s: str, chance_s: str, mode: str, day: str) -> str:
     """
-    Erstelle EINE kurze Solo-Frage (max. 22 Wörter) im UNDO-Stil.
-    - Du-Form, warm, konkret, alltagstauglich.
-    - Motiv/Chance subtil einfließen lassen.
-    - Gib NUR die Frage zurück (eine Zeile, endet mit "?").
+    KI-Solo-Frage – gecacht pro (Motiv, Chance, Modus, Tag).
+    `day` ist nur Cache-Schlüssel; Fehler werfen und werden daher nicht gecacht.
     """
-    motive_s = (motive or "").strip()
-    chance_s = (chance or "").strip()
+    return _solo_question_ai(motive_s, chance_s, mode)
+
 
+def _solo_question_fallback(motive_s: str, chance_s: str, seed_texts: List[str] | None) -> str:
     # Fallback (nur im absoluten Notfall)
     fallback_seeds = seed_texts or [
         "Worauf richtest du heute deinen Blick – ganz bewusst?",
@@ -543,41 +1531,107 @@ def ai_generate_question(motive: str, chance: str, mode: str, seed_texts: List[s
     fallback = random.choice(fallback_seeds)
     if motive_s or chance_s:
         fallback = f"{fallback} (mit Blick auf: {motive_s or 'dein Warum'} / {chance_s or 'dein Ziel'})"
+    return fallback
+
+
+def ai_generate_question(
+    motive: str, chance: str, mode: str, seed_texts: List[str] | None = None, fresh: bool = False
+) -> str:
+    """
+    Erstelle EINE kurze Solo-Frage (max. 22 Wörter) im UNDO-Stil.
+    - Du-Form, warm, konkret, alltagstauglich.
+    - Motiv/Chance subtil einfließen lassen.
+    - Gib NUR die Frage zurück (eine Zeile, endet mit "?").
+    - Pro (Motiv, Chance, Modus) wird am selben Tag nur einmal generiert;
+      fresh=True (bezahlte Extra-Frage) fragt neu an und lässt den Tages-Cache aus.
+    """
+    motive_s = (motive or "").strip()
+    chance_s = (chance or "").strip()
+
+    if not _ai_available():
+        return _solo_question_fallback(motive_s, chance_s, seed_texts)
 
     try:
-        client = _ensure_openai_client()
-        system = (
-            "Formuliere genau EINE Frage im UNDO-Stil. Warm, konkret, natürlich. "
-            "Max. 22 Wörter. Kein Listenstil, kein Jargon, keine Emojis. "
-            "Gib NUR die Frage zurück."
-        )
-        user_msg = (
-            f"Modus: {mode or 'unbekannt'}\n"
-            f"Motiv: {motive_s or '-'}\n"
-            f"Chance: {chance_s or '-'}\n"
-            "Kontext: Tägliche Selbstreflexion, die zu kleinen bewussten Veränderungen einlädt."
-        )
+        if fresh:
+            return _solo_question_ai(motive_s, chance_s, mode or "")
+        return _solo_question_cached(motive_s, chance_s, mode or "", date.today().isoformat())
+    except Exception:
+        return _solo_question_fallback(motive_s, chance_s, seed_texts)
 
-        def _do():
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user_msg},
-                ],
-                temperature=0.4,
-                max_tokens=50,
-            )
-            text = (resp.choices[0].message.content or "").strip()
-            text = text.split("\n")[0].strip()
-            if not text.endswith("?"):
-                text += "?"
-            if len(text) > 180:
-                text = text[:180].rstrip() + "?"
-            return text
 
-        return _call_openai_safe(_do, fallback_text=fallback)
+async def ai_generate_question_async(motive: str, chance: str, mode: str, seed_texts: List[str] | None = None) -> str:
+    """Async-Variante von ai_generate_question (ohne Tages-Cache)."""
+    motive_s = (motive or "").strip()
+    chance_s = (chance or "").strip()
 
+    if not _ai_available():
+        return _solo_question_fallback(motive_s, chance_s, seed_texts)
+
+    try:
+        messages = _solo_question_messages(motive_s, chance_s, mode or "")
+        async with _async_openai_client() as client:
+            resp = await _create_async(client, _REQ_SOLO_QUESTION, messages)
+        return _solo_question_postprocess(resp)
     except Exception:
-        return fallback
-    
\ No newline at end of file
+        return _solo_question_fallback(motive_s, chance_s, seed_texts)
+
+
+_BULK_Q_CHUNK = 20  # darüber wächst die Latenz pro Request spürbar
+_NUMBERED_RE = re.compile(r"^\s*(\d+)\.\s*(.+?)\s*$", re.MULTILINE)
+
+
+_SYS_QUESTIONS_BULK: Final[str] = (
+    "Formuliere für jede Zeile genau EINE Frage im UNDO-Stil. Warm, konkret, natürlich, Du-Form. "
+    "8–22 Wörter, jede endet mit '?'. Kein Jargon, keine Emojis. "
+    "Gib je Eingabezeile genau eine Zeile zurück, gleich nummeriert, im Format '1. <frage>'."
+)
+
+
+def _questions_bulk_messages(rows: List[Tuple[str, str, str]]) -> list:
+    lines = [
+        f"{i}. Modus: {mode or 'unbekannt'} | Motiv: {motive or '-'} | Chance: {chance or '-'}"
+        for i, (motive, chance, mode) in enumerate(rows, 1)
+    ]
+    lines.append(f"\nGenau {len(rows)} Fragen, nummeriert 1..{len(rows)}.")
+    return [
+        {"role": "system", "content": _SYS_QUESTIONS_BULK},
+        {"role": "user", "content": "\n".join(lines)},
+    ]
+
+
+def _questions_bulk_call(rows: List[Tuple[str, str, str]]) -> List[Optional[str]]:
+    """Ein Request für bis zu _BULK_Q_CHUNK Zeilen; wirft, wenn Nummerierung/Anzahl nicht passt."""
+    client = _ensure_openai_client()
+    resp = client.chat.completions.create(
+        model=_REQ_SOLO_QUESTION["model"],
+        temperature=_REQ_SOLO_QUESTION["temperature"],
+        max_tokens=_REQ_SOLO_QUESTION["max_tokens"] * len(rows),
+        timeout=_OPENAI_TIMEOUT_BATCH,
+        messages=_questions_bulk_messages(rows),
+    )
+    found = {int(n): q for n, q in _NUMBERED_RE.findall(resp.choices[0].message.content or "")}
+    if sorted(found) != list(range(1, len(rows) + 1)):
+        raise ValueError("Bulk-Fragen: Nummerierung passt nicht")
+    return [q if q.endswith("?") and len(q) <= 180 else None for q in (found[i] for i in range(1, len(rows) + 1))]
+
+
+def ai_generate_questions_bulk(rows: List[Tuple[str, str, str]]) -> List[str]:
+    """
+    Tagesfragen für viele Nutzer (z. B. Cron) – ein Request je 20 Zeilen statt einer pro Nutzer.
+    rows: [(motive, chance, mode), ...] → Fragen in gleicher Reihenfolge.
+    Kaputte Antwort → Einzel-Calls für den Block; unbrauchbare Einzelfrage → Einzel-Call.
+    """
+    rows = [((m or "").strip(), (c or "").strip(), mode or "") for m, c, mode in rows]
+    if not _ai_available():
+        return [_solo_question_fallback(m, c, None) for m, c, _ in rows]
+
+    out: List[str] = []
+    for start in range(0, len(rows), _BULK_Q_CHUNK):
+        chunk = rows[start:start + _BULK_Q_CHUNK]
+        try:
+            qs = _questions_bulk_call(chunk)
+        except Exception:
+            logger.exception("ai_generate_questions_bulk: Block fehlgeschlagen, Einzel-Calls")
+            qs = [None] * len(chunk)
+        out.extend(q if q is not None else ai_generate_question(*row) for q, row in zip(qs, chunk))
+    return out
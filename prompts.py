@@ -71,13 +71,20 @@ PROMPT_CATEGORIES = {
     }
 }
 
+# Je Modus einmalig: (Subkategorie, Hauptkategorie, Fragen) als Tupel →
+# get_question baut pro Aufruf keine Key-Liste mehr. Verteilung bleibt:
+# erst gleichverteilt die Subkategorie, dann die Frage darin.
+_SUBS = {
+    mode: tuple((sub, data["parent"], tuple(data["questions"])) for sub, data in subs.items())
+    for mode, subs in PROMPT_CATEGORIES.items()
+}
+
 # Liefert: Hauptkategorie, Subkategorie, Frage
 def get_question(mode="morning"):
-    if mode not in PROMPT_CATEGORIES:
+    subs = _SUBS.get(mode)
+    if subs is None:
         raise ValueError("Mode must be 'morning' or 'evening'")
-    subcategory = random.choice(list(PROMPT_CATEGORIES[mode].keys()))
-    data = PROMPT_CATEGORIES[mode][subcategory]
-    parent_category = data["parent"]
-    question = random.choice(data["questions"])
+    subcategory, parent_category, questions = random.choice(subs)
+    question = random.choice(questions)
     
     return parent_category, subcategory, question
\ No newline at end of file
@@ -1,21 +1,37 @@
 from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
 import os
 
+WIDTH, HEIGHT = 1080, 1920
+BACKGROUND_COLOR = "#ffffff"
+
+# Fonts – Pfade ggf. anpassen für andere Betriebssysteme
+FONT_PATH_BOLD = "/System/Library/Fonts/Supplemental/Arial Bold.ttf"
+FONT_PATH_REGULAR = "/System/Library/Fonts/Supplemental/Arial.ttf"
+
+
+# TTF einmal je (Pfad, Größe) laden statt bei jedem Share-Bild
+@lru_cache(maxsize=16)
+def _font(path, size):
+    return ImageFont.truetype(path, size)
+
+
+# Leere Leinwand einmal anlegen, pro Bild nur kopieren
+@lru_cache(maxsize=1)
+def _blank_canvas():
+    return Image.new("RGB", (WIDTH, HEIGHT), color=BACKGROUND_COLOR)
+
+
 def generate_share_image(question, answer, username):
-    width, height = 1080, 1920
-    background_color = "#ffffff"
+    width, height = WIDTH, HEIGHT
     text_color = "#000000"
 
-    img = Image.new("RGB", (width, height), color=background_color)
+    img = _blank_canvas().copy()
     draw = ImageDraw.Draw(img)
 
-    # Fonts – Pfade ggf. anpassen für andere Betriebssysteme
-    font_path_bold = "/System/Library/Fonts/Supplemental/Arial Bold.ttf"
-    font_path_regular = "/System/Library/Fonts/Supplemental/Arial.ttf"
-
-    title_font = ImageFont.truetype(font_path_bold, 80)
-    text_font = ImageFont.truetype(font_path_bold, 50)
-    link_font = ImageFont.truetype(font_path_regular, 40)
+    title_font = _font(FONT_PATH_BOLD, 80)
+    text_font = _font(FONT_PATH_BOLD, 50)
+    link_font = _font(FONT_PATH_REGULAR, 40)
 
     # Title: My Undo
     draw.text((60, 80), "My Undo", fill=text_color, font=title_font)
@@ -29,20 +45,26 @@ def generate_share_image(question, answer, username):
         lines = []
         words = text.split()
         line = ""
+        # Breite wird mitgeführt statt die ganze Zeile pro Wort neu zu messen
+        line_width = 0.0
+        space_w = font.getlength(" ")
         for word in words:
-            test_line = f"{line} {word}".strip()
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            w = bbox[2] - bbox[0]
-            if w <= max_width:
-                line = test_line
+            word_w = font.getlength(word)
+            trial = line_width + (space_w if line else 0) + word_w
+            if trial <= max_width:
+                line = f"{line} {word}" if line else word
+                line_width = trial
             else:
-                lines.append(line)
+                if line:
+                    lines.append(line)
                 line = word
+                line_width = word_w
         lines.append(line)
+        # Zeilenhöhe hängt nur an der Schrift → einmal aus den Font-Metriken
+        ascent, descent = font.getmetrics()
+        line_height = ascent + descent
         for l in lines:
             draw.text((margin, y_offset), l, font=font, fill=text_color)
-            line_bbox = draw.textbbox((0, 0), l, font=font)
-            line_height = line_bbox[3] - line_bbox[1]
             y_offset += line_height + spacing
         return y_offset
 
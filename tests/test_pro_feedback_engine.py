@@ -0,0 +1,293 @@
+# tests/test_pro_feedback_engine.py
+"""
+Reine Engine-Helfer aus pro_feedback_engine (ohne Flask/DB, ohne echte KI).
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pro_feedback_engine as pfe
+
+
+@pytest.mark.parametrize("answer", [
+    "Übermorgen gehe ich es in Ruhe an, ganz sicher.",
+    "Ich plane es mir für die Vormittagsuhr ein, mal sehen.",
+    "HEUTE nehme ich mir dafür einen ruhigen Moment.",
+    "Morgens fällt es mir leichter, klar zu denken.",
+])
+def test_fallback_sees_time_hints_inside_words(answer):
+    # wie die ursprüngliche Teilstring-Prüfung: kein Zeitfenster-Hinweis nötig
+    assert pfe._FB_P2_TIME not in pfe._fallback_feedback("Q?", answer, "", "")
+
+
+def test_fallback_suggests_time_window_without_hint():
+    text = pfe._fallback_feedback("Q?", "Ich möchte einfach gelassener werden im Alltag.", "", "")
+    assert pfe._FB_P2_TIME in text
+
+
+# ------------------------------------------------------------
+# Fake-Client: jede create()-Anfrage bekommt den nächsten vorbereiteten Antworttext
+# ------------------------------------------------------------
+@pytest.fixture
+def replies(monkeypatch):
+    import json
+    from collections import OrderedDict
+    from types import SimpleNamespace
+    import _llm_cache
+
+    queue = []
+
+    def create(**kwargs):
+        content = queue.pop(0)
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False)
+        msg = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(pfe, "_ai_available", lambda: True)
+    monkeypatch.setattr(pfe, "_ensure_openai_client", lambda: client)
+    monkeypatch.setattr(_llm_cache, "_ENTRIES", OrderedDict())
+    pfe._solo_question_cached.cache_clear()
+    yield queue
+    pfe._solo_question_cached.cache_clear()
+    assert not queue, "nicht alle vorbereiteten Antworten wurden abgeholt"
+
+
+FB_A = "Du nimmst dir Zeit für dich, und das ist gut so.\n\nEin kleiner Schritt reicht heute völlig.\n\nUNDO-Impuls: Atme kurz durch."
+FB_B = "Ihr haltet zusammen, auch wenn es gerade holpert.\n\nEin kurzes Gespräch kann viel klären.\n\nWeDo-Impuls: Fragt nach."
+
+
+def _item(answer):
+    return {"question_text": "Q?", "answer_text": answer, "motive": "", "chance": ""}
+
+
+def test_feedback_batch_strips_echoed_tags(replies):
+    replies.append({"feedback": [f"[#1] {FB_A}", FB_B]})
+    out = pfe.ai_generate_feedback_batch([_item("eins"), _item("zwei")], audience="wedo")
+    assert out == [FB_A, FB_B]
+
+
+def test_feedback_batch_falls_back_per_item(replies):
+    replies.append({"feedback": [FB_A, "Zu kurz."]})
+    out = pfe.ai_generate_feedback_batch([_item("eins"), _item("zwei")])
+    assert out[0] == FB_A
+    assert out[1] == pfe._fallback_feedback("Q?", "zwei", "", "")
+
+
+def test_feedback_batch_wrong_count_falls_back_for_the_chunk(replies):
+    replies.append({"feedback": [FB_A]})
+    out = pfe.ai_generate_feedback_batch([_item("eins"), _item("zwei")])
+    assert out == [pfe._fallback_feedback("Q?", a, "", "") for a in ("eins", "zwei")]
+
+
+def test_feedback_batch_chunks_by_ten(replies):
+    replies.append({"feedback": [FB_A] * pfe._BATCH_CHUNK})
+    replies.append({"feedback": [FB_B]})
+    out = pfe.ai_generate_feedback_batch([_item(str(i)) for i in range(pfe._BATCH_CHUNK + 1)])
+    assert out == [FB_A] * pfe._BATCH_CHUNK + [FB_B]
+
+
+ROWS = [("Ruhe", "Fokus", "morning"), ("Mut", "", "evening")]
+
+
+def test_questions_bulk_parses_numbered_lines(replies):
+    replies.append("1. Was gibt dir heute Morgen einen ruhigen Start?\n  2.  Wo warst du heute mutig, auch nur ein bisschen?  ")
+    assert pfe.ai_generate_questions_bulk(ROWS) == [
+        "Was gibt dir heute Morgen einen ruhigen Start?",
+        "Wo warst du heute mutig, auch nur ein bisschen?",
+    ]
+
+
+def test_questions_bulk_single_call_for_unusable_line(replies):
+    replies.append("1. Was gibt dir heute Morgen einen ruhigen Start?\n2. Keine Frage hier.")
+    replies.append({"question": "Was hat dich heute ein wenig mutiger gemacht?"})
+    assert pfe.ai_generate_questions_bulk(ROWS)[1] == "Was hat dich heute ein wenig mutiger gemacht?"
+
+
+def test_questions_bulk_bad_numbering_falls_back_to_single_calls(replies):
+    replies.append("1. Was gibt dir heute Morgen einen ruhigen Start?\n3. Wo warst du heute mutig?")
+    replies.append({"question": "Was trägt dich heute?"})
+    replies.append({"question": "Wo warst du heute mutig?"})
+    assert pfe.ai_generate_questions_bulk(ROWS) == ["Was trägt dich heute?", "Wo warst du heute mutig?"]
+
+
+# ------------------------------------------------------------
+# _llm_cache
+# ------------------------------------------------------------
+@pytest.fixture
+def llm_cache(monkeypatch):
+    from collections import OrderedDict
+    from types import SimpleNamespace
+    import _llm_cache
+
+    clock = [1000.0]
+    monkeypatch.setattr(_llm_cache, "_ENTRIES", OrderedDict())
+    monkeypatch.setattr(_llm_cache, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    monkeypatch.setattr(_llm_cache, "_TTL", 60.0)
+    monkeypatch.setattr(_llm_cache, "_MAX", 2)
+    return _llm_cache, clock
+
+
+def _key(text):
+    import _llm_cache
+    return _llm_cache.key_for({"model": "m", "temperature": 0.5}, [{"role": "user", "content": text}])
+
+
+def test_llm_cache_expires_after_ttl(llm_cache):
+    cache, clock = llm_cache
+    cache.put(_key("a"), "A")
+    clock[0] += 59
+    assert cache.get(_key("a")) == "A"
+    clock[0] += 2
+    assert cache.get(_key("a")) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_llm_cache_evicts_least_recently_used(llm_cache):
+    cache, _ = llm_cache
+    cache.put(_key("a"), "A")
+    cache.put(_key("b"), "B")
+    assert cache.get(_key("a")) == "A"  # a ist jetzt frischer als b
+    cache.put(_key("c"), "C")
+    assert cache.get(_key("b")) is None
+    assert (cache.get(_key("a")), cache.get(_key("c"))) == ("A", "C")
+
+
+def test_llm_cache_skips_creative_temperatures(llm_cache):
+    cache, _ = llm_cache
+    key = cache.key_for({"model": "m", "temperature": 0.9}, [])
+    assert key is None
+    cache.put(key, "X")
+    assert cache.get(key) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_llm_cache_key_depends_on_params_and_messages():
+    import _llm_cache
+    msgs = [{"role": "user", "content": "x"}]
+    assert _llm_cache.key_for({"temperature": 0.5}, msgs) == _llm_cache.key_for({"temperature": 0.5}, list(msgs))
+    assert _llm_cache.key_for({"temperature": 0.5}, msgs) != _llm_cache.key_for({"temperature": 0.4}, msgs)
+
+
+# ------------------------------------------------------------
+# _group_question_finalize
+# ------------------------------------------------------------
+def test_group_question_finalize_rewrites_to_ihr_form():
+    q = "Wir fragen uns: was wollen wir heute für uns und unser Team klären?"
+    assert pfe._group_question_finalize(q) == (
+        "Ihr fragen euch: was wollen ihr heute für euch und euer Team klären?"
+    )
+
+
+def test_group_question_finalize_keeps_words_containing_pronouns():
+    q = "Was wollt ihr heute Abend in Ruhe gemeinsam wirklich abschließen?"
+    assert pfe._group_question_finalize(q) == q
+
+
+@pytest.mark.parametrize("q", ["Was tragt ihr heute?", " ".join(["Wort"] * 23) + "?"])
+def test_group_question_finalize_rejects_bad_length(q):
+    assert pfe._group_question_finalize(q) == pfe._GROUP_Q_FALLBACK
+
+
+# ------------------------------------------------------------
+# Gemeinsamer Antwort-Cache über sync/async/stream
+# ------------------------------------------------------------
+class FakeAsyncClient:
+    """AsyncOpenAI-Ersatz: zählt offene Clients; create() antwortet mit FB_A (oder scheitert ohne Cache)."""
+    opened = 0
+    closed = 0
+
+    def __init__(self, reply=None):
+        from types import SimpleNamespace
+        FakeAsyncClient.opened += 1
+
+        async def create(**kwargs):
+            if reply is None:
+                raise AssertionError("hätte aus dem Cache kommen müssen")
+            msg = SimpleNamespace(content=reply)
+            return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        FakeAsyncClient.closed += 1
+
+
+def test_feedback_entry_points_share_cache_keys(replies, monkeypatch):
+    import asyncio
+
+    replies.append(FB_A)
+    assert pfe.ai_generate_feedback("Q?", "Heute  ruhig\nstarten.", "", "", mode="morning") == FB_A
+
+    # ohne Client: ein Cache-Miss würde beim create() scheitern und den Fallback liefern
+    monkeypatch.setattr(pfe, "_new_async_openai_client", FakeAsyncClient)
+    monkeypatch.setattr(pfe, "_ensure_openai_client", lambda: None)
+    answer = "  Heute ruhig starten. "
+    assert asyncio.run(pfe.ai_generate_feedback_async("Q?", answer, "", "", mode="morning")) == FB_A
+    assert list(pfe.ai_generate_feedback_stream("Q?", answer, "", "", mode="morning")) == [FB_A]
+
+
+def test_report_entry_points_share_cache_keys(replies, monkeypatch):
+    import asyncio
+
+    replies.append(FB_A)
+    replies.append("Du bist klarer geworden, das trägt dich weiter.\n\nUNDO-Impuls: Bleib dran.")
+    weekly = pfe.ai_weekly_report(["eins  zwei", "drei"], "Ruhe", "")
+    compare = pfe.ai_answer_compare("Q?", "alt", "neu  und klar")
+
+    monkeypatch.setattr(pfe, "_new_async_openai_client", FakeAsyncClient)
+    assert asyncio.run(pfe.ai_weekly_report_async(["eins zwei", " drei"], "Ruhe ", "")) == weekly
+    assert asyncio.run(pfe.ai_answer_compare_async("Q?", "alt", "neu und klar")) == compare
+
+
+def test_feedback_many_accepts_sync_kwargs_and_isolates_failures(monkeypatch):
+    import asyncio
+
+    monkeypatch.setattr(pfe, "_ai_available", lambda: False)
+    good = {**_item("eins"), "mode": "evening", "user_key": "7"}
+    broken = {"question_text": "Q?", "answer_text": "zwei", "unbekannt": 1}
+    out = asyncio.run(pfe.ai_generate_feedback_many([good, broken]))
+    assert out == [pfe._fallback_feedback("Q?", a, "", "") for a in ("eins", "zwei")]
+
+
+def test_rejected_requests_are_logged_even_behind_fallbacks(replies, monkeypatch, caplog):
+    class AuthError(Exception):
+        status_code = 401
+
+    def create(**kwargs):
+        raise AuthError("invalid api key")
+
+    from types import SimpleNamespace
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(pfe, "_ensure_openai_client", lambda: client)
+    with caplog.at_level("ERROR", logger=pfe.logger.name):
+        assert pfe.ai_weekly_report(["eins"], "", "") == pfe._WEEKLY_FALLBACK
+    assert "AuthError" in caplog.text
+
+
+def test_async_clients_are_closed(monkeypatch):
+    import asyncio
+    from collections import OrderedDict
+    import _llm_cache
+
+    monkeypatch.setattr(pfe, "_ai_available", lambda: True)
+    monkeypatch.setattr(_llm_cache, "_ENTRIES", OrderedDict())
+    monkeypatch.setattr(FakeAsyncClient, "opened", 0)
+    monkeypatch.setattr(FakeAsyncClient, "closed", 0)
+    monkeypatch.setattr(pfe, "_new_async_openai_client", lambda: FakeAsyncClient(FB_A))
+
+    # Einzelaufruf: eigener Client, danach geschlossen
+    assert asyncio.run(pfe.ai_weekly_report_async(["eins"], "", "")) == FB_A
+    assert (FakeAsyncClient.opened, FakeAsyncClient.closed) == (1, 1)
+
+    # Sammel-Helfer: ein Client für alle Einträge, danach geschlossen
+    out = asyncio.run(pfe.ai_generate_feedback_many([_item(str(i)) for i in range(5)]))
+    assert out == [FB_A] * 5
+    assert (FakeAsyncClient.opened, FakeAsyncClient.closed) == (2, 2)
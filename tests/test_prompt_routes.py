@@ -0,0 +1,160 @@
+# tests/test_prompt_routes.py
+"""
+Eingeloggte Antwort-Routen (/prompt, /wedo/<id>/prompt) über den Flask-Test-Client.
+
+current_user ist dort ein LocalProxy – Abbuchung und Streak-Belohnung müssen
+damit funktionieren. Ohne OPENAI_API_KEY läuft alles über die Fallbacks.
+"""
+import importlib
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture(scope="module")
+def fa(tmp_path_factory):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}"
+    os.environ.pop("OPENAI_API_KEY", None)
+    module = importlib.import_module("flask_app")
+    module.app.config["TESTING"] = True
+    return module
+
+
+@pytest.fixture
+def user_id(fa):
+    """Free-User, dessen nächste Antwort Streak-Tag 3 erreicht (+1 Token)."""
+    from models import db, User
+    with fa.app.app_context():
+        db.drop_all()
+        db.create_all()
+        u = User(
+            username="a", email="a@example.com", password="x", subscription="free",
+            tokens=5, streak=2, last_reflection_date=(datetime.utcnow() - timedelta(days=1)).date(),
+        )
+        db.session.add(u)
+        db.session.commit()
+        return u.id
+
+
+def _client(fa, uid):
+    c = fa.app.test_client()
+    with c.session_transaction() as s:
+        s["_user_id"] = str(uid)
+    return c
+
+
+def _state(fa, uid):
+    from models import db, User, Reflection
+    with fa.app.app_context():
+        u = db.session.get(User, uid)
+        return Reflection.query.count(), u.tokens, u.streak
+
+
+ANSWER = "Heute will ich ruhig starten und einen kleinen Schritt gehen."
+
+
+def test_solo_extra_answer_on_streak_day_3(fa, user_id):
+    resp = _client(fa, user_id).post("/prompt", data={"answer": ANSWER, "question_text": "Q?", "extra": "1"})
+    assert resp.status_code == 302
+    assert "/feedback/" in resp.headers["Location"]
+    # 5 − 1 (Extra) + 1 (Streak-Tag 3)
+    assert _state(fa, user_id) == (1, 5, 3)
+
+
+def test_wedo_extra_answer_on_streak_day_3(fa, user_id):
+    from models import db, Group
+    with fa.app.app_context():
+        grp = Group(name="G", created_by=str(user_id), group_members="")
+        db.session.add(grp)
+        db.session.commit()
+        gid = grp.id
+    resp = _client(fa, user_id).post(
+        f"/wedo/{gid}/prompt", data={"answer": ANSWER, "question_text": "Q?", "extra": "1"}
+    )
+    assert resp.status_code == 302
+    assert "/feedback/" in resp.headers["Location"]
+    assert _state(fa, user_id) == (1, 5, 3)
+
+
+@pytest.fixture
+def failing_rewards(fa, monkeypatch):
+    def boom(*args, **kwargs):
+        raise RuntimeError("streak kaputt")
+    monkeypatch.setattr(fa, "update_streak_and_grant_tokens", boom)
+
+
+def test_solo_answer_survives_failed_reward(fa, user_id, failing_rewards):
+    resp = _client(fa, user_id).post("/prompt", data={"answer": ANSWER, "question_text": "Q?", "extra": "1"})
+    assert resp.status_code == 302
+    assert "/feedback/" in resp.headers["Location"]
+    # Antwort + Abbuchung bleiben, Belohnung entfällt
+    assert _state(fa, user_id) == (1, 4, 2)
+
+
+def test_wedo_answer_survives_failed_reward(fa, user_id, failing_rewards):
+    from models import db, Group
+    with fa.app.app_context():
+        grp = Group(name="G", created_by=str(user_id), group_members="")
+        db.session.add(grp)
+        db.session.commit()
+        gid = grp.id
+    resp = _client(fa, user_id).post(
+        f"/wedo/{gid}/prompt", data={"answer": ANSWER, "question_text": "Q?", "extra": "1"}
+    )
+    assert resp.status_code == 302
+    assert "/feedback/" in resp.headers["Location"]
+    assert _state(fa, user_id) == (1, 4, 2)
+
+
+@pytest.fixture
+def fake_questions(fa, monkeypatch):
+    """KI-Fragen über einen Fake-Client: jede Anfrage liefert eine neue, nummerierte Frage."""
+    import json
+    from types import SimpleNamespace
+    import pro_feedback_engine as pfe
+
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        q = f"Was wollt ihr heute in Ruhe gemeinsam klären, Schritt Nummer {len(calls)}?"
+        msg = SimpleNamespace(content=json.dumps({"question": q}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(pfe, "_ai_available", lambda: True)
+    monkeypatch.setattr(pfe, "_ensure_openai_client", lambda: client)
+    pfe._solo_question_cached.cache_clear()
+    pfe._group_question_cached.cache_clear()
+    yield calls
+    pfe._solo_question_cached.cache_clear()
+    pfe._group_question_cached.cache_clear()
+
+
+def test_solo_extra_question_is_not_the_daily_one(fa, user_id, fake_questions):
+    c = _client(fa, user_id)
+    daily = c.get("/prompt").get_data(as_text=True)
+    again = c.get("/prompt").get_data(as_text=True)
+    extra = c.get("/prompt?extra=1").get_data(as_text=True)
+    assert "Nummer 1?" in daily and "Nummer 1?" in again  # Tagesfrage aus dem Cache
+    assert "Nummer 2?" in extra and "Nummer 1?" not in extra
+    assert len(fake_questions) == 2
+
+
+def test_wedo_extra_question_is_not_the_daily_one(fa, user_id, fake_questions):
+    from models import db, Group
+    with fa.app.app_context():
+        grp = Group(name="G", created_by=str(user_id), group_members="")
+        db.session.add(grp)
+        db.session.commit()
+        gid = grp.id
+    c = _client(fa, user_id)
+    daily = c.get(f"/wedo/{gid}/prompt").get_data(as_text=True)
+    extra = c.get(f"/wedo/{gid}/prompt?extra=1").get_data(as_text=True)
+    assert "Nummer 1?" in daily
+    assert "Nummer 2?" in extra and "Nummer 1?" not in extra